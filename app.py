@@ -6,16 +6,36 @@ import requests
 import json
 import os
 import random
+import heapq
+import re
+import html
+import threading
+import queue
+import shutil
+import pickle
+import sqlite3
+import uuid
+import argparse
+import numpy as np
 import pandas as pd
 
+from array import array
 from io import BytesIO
+from collections import OrderedDict
+from contextlib import closing
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from bs4 import BeautifulSoup
+from email.utils import parsedate_to_datetime
+from urllib.parse import quote, unquote
+from openpyxl import Workbook
+from requests.adapters import HTTPAdapter
 
 from flask import (
     Flask,
     request,
-    render_template_string,
+    jsonify,
+    Response,
+    render_template,
     send_file,
     redirect,
     session,
@@ -62,6 +82,81 @@ API_KEY = "01000000000ea500e2d816aa0a9bc44418f20e0f55571f42f79ae469d57353f9337dd
 SECRET_KEY = "AQAAAAAOpQDi2BaqCpvERBjyDg9Vw0VyAu/CjIVNHsmmqld7Ag=="
 CUSTOMER_ID = 4174381
 
+# keywordstool 동시 호출 설정 (스레드 수 / 초당 요청 수)
+KEYWORD_FETCH_WORKERS = int(os.environ.get("KEYWORD_FETCH_WORKERS", 4))
+KEYWORD_FETCH_RPS = float(os.environ.get("KEYWORD_FETCH_RPS", 5))
+# keywordstool 1회 호출에 묶어 보낼 힌트 키워드 수 (API 최대 5개)
+KEYWORD_BATCH_SIZE = max(1, min(5, int(os.environ.get("KEYWORD_BATCH_SIZE", 5))))
+
+# 외부 HTTP 호출 설정 (연결 풀 크기 / 재시도 횟수 / 백오프(초) / 엔드포인트별 타임아웃(초))
+HTTP_POOL_SIZE = int(os.environ.get("HTTP_POOL_SIZE", 10))
+HTTP_MAX_RETRIES = int(os.environ.get("HTTP_MAX_RETRIES", 3))
+HTTP_BACKOFF_BASE = float(os.environ.get("HTTP_BACKOFF_BASE", 0.5))
+HTTP_BACKOFF_MAX = float(os.environ.get("HTTP_BACKOFF_MAX", 20))
+HTTP_TIMEOUTS = {
+    "keywordstool": float(os.environ.get("KEYWORDSTOOL_TIMEOUT", 10)),
+    "search": float(os.environ.get("SEARCH_TIMEOUT", 5)),
+}
+
+# 원고 중복 검사 (동시 검사 수 / 전체 초당 검색 수 / 기본·최대 검사 문장 수)
+DUP_CHECK_WORKERS = int(os.environ.get("DUP_CHECK_WORKERS", 4))
+DUP_CHECK_RPS = float(os.environ.get("DUP_CHECK_RPS", 2))
+DUP_CHECK_SAMPLE_SIZE = int(os.environ.get("DUP_CHECK_SAMPLE_SIZE", 5))
+DUP_CHECK_MAX_SAMPLE = int(os.environ.get("DUP_CHECK_MAX_SAMPLE", 50))
+DUP_FULL_SCAN_MAX = int(os.environ.get("DUP_FULL_SCAN_MAX", 300))  # 전체 검사 모드 최대 문장 수
+# 동시에 실행할 중복 검사 작업 수 (리포트 작업과 별도 스레드 풀, 검색 속도는 어차피 DUP_CHECK_RPS로 공유)
+DUP_JOB_WORKERS = int(os.environ.get("DUP_JOB_WORKERS", 2))
+# 문장별 검사 결과 캐시 (유효시간(초) / 최대 보관 문장 수)
+DUP_CACHE_TTL = int(os.environ.get("DUP_CACHE_TTL", 24 * 3600))
+DUP_CACHE_MAX_ENTRIES = int(os.environ.get("DUP_CACHE_MAX_ENTRIES", 20000))
+
+# 이 행 수 이상인 리포트는 엑셀을 write-only 모드로 만들어 응답에 바로 스트리밍 (메모리 일정)
+EXCEL_STREAMING_MIN_ROWS = int(os.environ.get("EXCEL_STREAMING_MIN_ROWS", 10000))
+
+# 업종 템플릿 파일 / 계정·프리셋 저장소 변경 확인 주기(초)
+CONFIG_CHECK_INTERVAL = float(os.environ.get("CONFIG_CHECK_INTERVAL", 1))
+
+# 계정 / 프리셋 저장소 (SQLite). 처음 열 때 기존 JSON 파일을 한 번만 가져온다.
+APP_DB_FILE = os.environ.get("APP_DB_FILE", "jnt_data.db")
+ACCOUNTS_FILE = "accounts.json"
+SHARED_PRESETS_FILE = "keyword_presets.json"
+
+# 리포트 보관소 (디스크 경로 / 메모리 캐시 한도(bytes) / 사용자별 보관 개수 / 보관 기간(초))
+REPORT_STORE_DIR = os.environ.get("REPORT_STORE_DIR", "reports")
+REPORT_MEMORY_MAX_BYTES = int(os.environ.get("REPORT_MEMORY_MAX_BYTES", 256 * 1024 * 1024))
+REPORT_KEEP_PER_USER = int(os.environ.get("REPORT_KEEP_PER_USER", 5))
+REPORT_TTL = int(os.environ.get("REPORT_TTL", 7 * 24 * 3600))
+
+# 그래프에 표시할 검색량 상위 키워드 수 (기본값 / 최대값)
+CHART_TOP_N = int(os.environ.get("CHART_TOP_N", 20))
+CHART_TOP_MAX = int(os.environ.get("CHART_TOP_MAX", 100))
+
+# 프리셋 미리 계산 (서버 안에서 매일 실행할 시각 "HH:MM", 비우면 안 함 / CLI 실행 시 초당 호출 수)
+# PREWARM_AT은 `python app.py serve`로 띄운 서버에서만 동작한다. gunicorn 등 WSGI 서버로 띄우면
+# 스케줄러가 시작되지 않으므로(워커마다 중복 실행되지 않도록) cron에서 `python app.py prewarm`을 실행한다.
+# CLI는 서버와 별도 프로세스라 버킷을 나눠 쓰지 못하므로 기본값을 화면 요청 한도의 절반으로 둔다.
+PREWARM_AT = os.environ.get("PREWARM_AT", "")
+PREWARM_RPS = float(os.environ.get("PREWARM_RPS", KEYWORD_FETCH_RPS / 2))
+
+# 리포트 생성 작업 큐 (동시 실행 작업 수 / 완료 작업 보관 시간(초))
+REPORT_JOB_WORKERS = int(os.environ.get("REPORT_JOB_WORKERS", 4))
+REPORT_JOB_TTL = int(os.environ.get("REPORT_JOB_TTL", 3600))
+# 작업 상태 공유 저장소 (SQLite 파일, 다른 워커 프로세스/재시작 후에도 조회)
+# 이 시간(초) 넘게 진행 소식이 없는 미완료 작업은 실행하던 프로세스가 사라진 것으로 본다
+JOBS_DB_FILE = os.environ.get("JOBS_DB_FILE", "jnt_jobs.db")
+REPORT_JOB_STALE_AFTER = int(os.environ.get("REPORT_JOB_STALE_AFTER", 900))
+
+# keywordstool 응답 캐시 (SQLite 파일 / 유효시간(초) / 최대 보관 건수)
+CACHE_DB_FILE = os.environ.get("CACHE_DB_FILE", "jnt_cache.db")
+KEYWORD_CACHE_TTL = int(os.environ.get("KEYWORD_CACHE_TTL", 24 * 3600))
+KEYWORD_CACHE_MAX_ENTRIES = int(os.environ.get("KEYWORD_CACHE_MAX_ENTRIES", 5000))
+
+# 키워드 조회 이력 (SQLite 파일 / 이 시간(초) 안에 조회한 기준 키워드는 API 대신 이력 재사용 / 보관 일수)
+# 기본 재사용 기간은 캐시 유효시간과 같다 (캐시가 만료된 데이터를 이력으로 더 오래 쓰지 않도록).
+KEYWORD_HISTORY_DB_FILE = os.environ.get("KEYWORD_HISTORY_DB_FILE", "jnt_history.db")
+KEYWORD_HISTORY_MAX_AGE = int(os.environ.get("KEYWORD_HISTORY_MAX_AGE", KEYWORD_CACHE_TTL))
+KEYWORD_HISTORY_RETENTION_DAYS = int(os.environ.get("KEYWORD_HISTORY_RETENTION_DAYS", 400))
+
 # ==========================
 # 회사 정보 (리포트 하단 표)
 # ==========================
@@ -73,30 +168,55 @@ COMPANY_INFO = {
 }
 
 # ==========================
-# 계정 관리 (accounts.json)
+# 설정 파일 캐시 (업종 템플릿)
 # ==========================
-ACCOUNTS_FILE = "accounts.json"
-ACCOUNTS = {}
-
-
-def load_accounts():
-    global ACCOUNTS
-    try:
-        with open(ACCOUNTS_FILE, "r", encoding="utf-8") as f:
-            ACCOUNTS = json.load(f)
-    except Exception:
-        ACCOUNTS = {}
-
-
-def save_accounts():
-    with open(ACCOUNTS_FILE, "w", encoding="utf-8") as f:
-        json.dump(ACCOUNTS, f, ensure_ascii=False, indent=2)
+class FileCache:
+    """
+    JSON 파일 내용을 메모리에 캐시한다.
+    파일의 (inode, mtime, size)가 바뀌었을 때만 다시 읽으므로 다른 워커 프로세스의 수정도 반영되고,
+    check_interval(초) 안의 반복 조회는 stat 없이 캐시를 그대로 쓴다.
+    """
 
+    def __init__(self, check_interval):
+        self.check_interval = check_interval
+        self.entries = {}  # { path: (stat_key, value, checked_at) }
+        self.lock = threading.Lock()
 
-load_accounts()
+    @staticmethod
+    def _stat_key(path):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def load(self, path, default=None):
+        now = time.monotonic()
+        with self.lock:
+            hit = self.entries.get(path)
+        if hit and now - hit[2] < self.check_interval:
+            return hit[1]
+
+        key = self._stat_key(path)
+        if hit and hit[0] == key:
+            with self.lock:
+                self.entries[path] = (key, hit[1], now)
+            return hit[1]
+
+        value = default
+        if key is not None:
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    value = json.load(f)
+            except Exception:
+                value = default
+        with self.lock:
+            self.entries[path] = (key, value, now)
+        return value
+
+
+CONFIG_CACHE = FileCache(CONFIG_CHECK_INTERVAL)
 
-# 유저별 마지막 엑셀 저장
-LAST_EXCEL = {}  # { user_id: {"bytes": b"...", "filename": "..." } }
 
 # ==========================
 # 업종 템플릿 로딩 세팅
@@ -132,17 +252,14 @@ def load_industry_template(industry_code: str):
     if not code_raw:
         return default
 
-    # 업종 코드가 있으면 해당 json 로딩
+    # 업종 코드가 있으면 해당 json 로딩 (캐시, 파일이 없거나 깨지면 기본 템플릿)
     path = os.path.join(TEMPLATE_DIR, f"{code_raw}.json")
-    try:
-        with open(path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        merged = default.copy()
-        merged.update(data)
-        return merged
-    except Exception:
-        # 파일이 없거나 깨지면 기본 템플릿
+    data = CONFIG_CACHE.load(path)
+    if not isinstance(data, dict):
         return default
+    merged = default.copy()
+    merged.update(data)
+    return merged
 
 
 # ==========================
@@ -175,86 +292,1044 @@ def get_headers(method, uri):
     }
 
 
+# ==========================
+# 호출 속도 제한 (토큰 버킷)
+# ==========================
+class TokenBucket:
+    """초당 rate개씩 토큰이 채워지는 스레드 안전 토큰 버킷"""
+
+    def __init__(self, rate, capacity=1):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """토큰이 생길 때까지 기다렸다가 1개 소비 (rate <= 0 이면 제한 없음)"""
+        if self.rate <= 0:
+            return
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.capacity, self.tokens + (now - self.updated) * self.rate
+                )
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+# keywordstool 호출은 모든 요청이 하나의 버킷을 공유
+KEYWORD_API_BUCKET = TokenBucket(KEYWORD_FETCH_RPS)
+
+
+# ==========================
+# 공용 HTTP 클라이언트 (연결 재사용 + 재시도)
+# ==========================
+class HttpClient:
+    """
+    requests.Session 하나를 모든 스레드가 공유하는 HTTP 클라이언트.
+    429/5xx 응답과 연결 오류는 지수 백오프(+지터)로 재시도하고,
+    Retry-After 헤더가 있으면 그 시간만큼 기다린다.
+    """
+
+    RETRY_STATUS = {429, 500, 502, 503, 504}
+
+    def __init__(self, pool_size, max_retries, backoff_base, backoff_max):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def _delay(self, attempt, retry_after=None):
+        if retry_after:
+            try:
+                wait = float(retry_after)
+            except ValueError:
+                try:
+                    wait = parsedate_to_datetime(retry_after).timestamp() - time.time()
+                except (TypeError, ValueError):
+                    wait = None
+            if wait is not None:
+                return min(self.backoff_max, max(0.0, wait))
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def get(self, url, endpoint, params=None, headers=None, bucket=None):
+        """
+        GET 요청. headers가 함수면 시도할 때마다 새로 만들고(서명 갱신),
+        bucket(TokenBucket)이 있으면 시도할 때마다 토큰을 소비한다.
+        재시도를 모두 소진하면 마지막 예외를 그대로 올린다.
+        """
+        timeout = HTTP_TIMEOUTS.get(endpoint, 10)
+        for attempt in range(self.max_retries + 1):
+            if bucket is not None:
+                bucket.acquire()
+            try:
+                res = self.session.get(
+                    url,
+                    params=params,
+                    headers=headers() if callable(headers) else headers,
+                    timeout=timeout,
+                )
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt >= self.max_retries:
+                    raise
+                time.sleep(self._delay(attempt))
+                continue
+
+            if res.status_code in self.RETRY_STATUS and attempt < self.max_retries:
+                time.sleep(self._delay(attempt, res.headers.get("Retry-After")))
+                continue
+            res.raise_for_status()
+            return res
+
+
+HTTP = HttpClient(HTTP_POOL_SIZE, HTTP_MAX_RETRIES, HTTP_BACKOFF_BASE, HTTP_BACKOFF_MAX)
+
+
+# ==========================
+# 디스크 캐시 (SQLite, TTL + LRU)
+# ==========================
+def sqlite_connect(path):
+    """WAL 모드 SQLite 연결 (여러 스레드/워커 프로세스에서 동시에 사용)"""
+    conn = sqlite3.connect(path, timeout=10)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+class SqliteCache:
+    """
+    key → JSON 값을 저장하는 SQLite 캐시.
+    ttl(초)이 지난 항목은 무효, max_entries를 넘으면 가장 오래 안 쓴 항목부터 삭제한다.
+    적중/미스 횟수는 프로세스별로 집계한다.
+    """
+
+    def __init__(self, path, table, ttl, max_entries):
+        self.path = path
+        self.table = table
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        with closing(sqlite_connect(self.path)) as conn, conn:
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "created_at REAL NOT NULL, last_used REAL NOT NULL)"
+            )
+            conn.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_{table}_last_used ON {table}(last_used)"
+            )
+
+    def _count(self, hit):
+        with self.lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, key):
+        now = time.time()
+        with closing(sqlite_connect(self.path)) as conn, conn:
+            row = conn.execute(
+                f"SELECT value, created_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.ttl:
+                self._count(False)
+                return None
+            conn.execute(
+                f"UPDATE {self.table} SET last_used = ? WHERE key = ?", (now, key)
+            )
+        self._count(True)
+        return json.loads(row[0])
+
+    def set(self, key, value):
+        now = time.time()
+        with closing(sqlite_connect(self.path)) as conn, conn:
+            conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), now, now),
+            )
+            conn.execute(
+                f"DELETE FROM {self.table} WHERE created_at < ?", (now - self.ttl,)
+            )
+            conn.execute(
+                f"DELETE FROM {self.table} WHERE key IN ("
+                f"SELECT key FROM {self.table} ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def stats(self):
+        with self.lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+
+KEYWORD_CACHE = SqliteCache(
+    CACHE_DB_FILE, "keyword_cache", KEYWORD_CACHE_TTL, KEYWORD_CACHE_MAX_ENTRIES
+)
+
+
+def keyword_cache_key(hint_keyword, show_detail="1"):
+    """
+    캐시 키: 공백 제거 + 소문자로 정규화한 힌트 키워드 + showDetail.
+    묶음 호출은 힌트 키워드를 쉼표로 이은 문자열을 넘긴다 (묶음 전체 응답을 한 항목으로 저장).
+    v2: 묶음 응답을 나눠 기준 키워드별로 저장하던 이전 항목은 쓰지 않는다.
+    """
+    normalized = "".join(hint_keyword.split()).lower()
+    return f"v2|{show_detail}|{normalized}"
+
+
+# ==========================
+# 키워드 조회 이력 (SQLite 시계열)
+# ==========================
+class KeywordHistory:
+    """
+    keywordstool로 조회한 모든 행을 (기준 키워드, 조회 시각)별 스냅샷으로 쌓아 두는 이력 저장소.
+    키워드+날짜, 기준 키워드+조회 시각 인덱스로 조회하고,
+    max_age(초) 안의 최신 스냅샷은 API를 다시 부르지 않고 그대로 재사용한다.
+    retention_days가 지난 이력은 1시간에 한 번 정리한다.
+    """
+
+    PRUNE_INTERVAL = 3600
+
+    def __init__(self, path, max_age, retention_days):
+        self.path = path
+        self.max_age = max_age
+        self.retention_days = retention_days
+        self.hits = 0
+        self.last_pruned = 0.0
+        self.lock = threading.Lock()
+        with closing(sqlite_connect(self.path)) as conn, conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS keyword_history ("
+                "base_key TEXT NOT NULL, base TEXT NOT NULL, keyword TEXT NOT NULL, "
+                "pc INTEGER NOT NULL, mobile INTEGER NOT NULL, comp_idx TEXT, "
+                "pl_avg_depth REAL, fetched_at REAL NOT NULL, date TEXT NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_keyword_history_keyword "
+                "ON keyword_history(keyword, date)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_keyword_history_base "
+                "ON keyword_history(base_key, fetched_at)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_keyword_history_date ON keyword_history(date)"
+            )
+
+    @staticmethod
+    def base_key(base):
+        # keywordstool 캐시와 같은 키 (묶음 호출은 힌트 키워드를 쉼표로 이은 문자열)
+        return keyword_cache_key(base)
+
+    def record(self, split, fetched_at=None):
+        """{ 기준 키워드: keywordList } 를 한 트랜잭션으로 저장"""
+        now = fetched_at or time.time()
+        date = datetime.fromtimestamp(now).strftime("%Y-%m-%d")
+        rows = [
+            (
+                self.base_key(base),
+                base,
+                item["relKeyword"],
+                to_int(item.get("monthlyPcQcCnt")),
+                to_int(item.get("monthlyMobileQcCnt")),
+                item.get("compIdx"),
+                to_float(item.get("plAvgDepth")),
+                now,
+                date,
+            )
+            for base, items in split.items()
+            for item in items
+            if item.get("relKeyword")
+        ]
+        with closing(sqlite_connect(self.path)) as conn, conn:
+            conn.executemany(
+                "INSERT INTO keyword_history VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows
+            )
+            if now - self.last_pruned > self.PRUNE_INTERVAL:
+                self.last_pruned = now
+                cutoff = datetime.fromtimestamp(
+                    now - self.retention_days * 86400
+                ).strftime("%Y-%m-%d")
+                conn.execute("DELETE FROM keyword_history WHERE date < ?", (cutoff,))
+
+    def latest(self, base):
+        """
+        max_age 안에 조회한 기준 키워드의 최신 스냅샷을 keywordList 형식으로 반환 (없으면 None).
+        빈 결과도 스냅샷으로 남지 않으므로 결과가 0건이던 키워드는 다시 조회한다.
+        """
+        key = self.base_key(base)
+        with closing(sqlite_connect(self.path)) as conn:
+            row = conn.execute(
+                "SELECT MAX(fetched_at) FROM keyword_history WHERE base_key = ?", (key,)
+            ).fetchone()
+            if row[0] is None or time.time() - row[0] > self.max_age:
+                return None
+            rows = conn.execute(
+                "SELECT keyword, pc, mobile, comp_idx, pl_avg_depth FROM keyword_history "
+                "WHERE base_key = ? AND fetched_at = ? ORDER BY rowid",
+                (key, row[0]),
+            ).fetchall()
+        with self.lock:
+            self.hits += 1
+        return [
+            {
+                "relKeyword": keyword,
+                "monthlyPcQcCnt": pc,
+                "monthlyMobileQcCnt": mobile,
+                "compIdx": comp_idx,
+                "plAvgDepth": depth,
+            }
+            for keyword, pc, mobile, comp_idx, depth in rows
+        ]
+
+    def fetched_times(self, bases):
+        """기준 키워드(또는 묶음 라벨)별 가장 최근 조회 시각 { base: fetched_at } (이력이 없으면 빠짐)"""
+        keys = {self.base_key(base): base for base in bases}
+        if not keys:
+            return {}
+        placeholders = ",".join("?" * len(keys))
+        with closing(sqlite_connect(self.path)) as conn:
+            rows = conn.execute(
+                "SELECT base_key, MAX(fetched_at) FROM keyword_history "
+                f"WHERE base_key IN ({placeholders}) GROUP BY base_key",
+                list(keys),
+            ).fetchall()
+        return {keys[key]: fetched_at for key, fetched_at in rows}
+
+    def stats(self):
+        with self.lock:
+            return {"hits": self.hits}
+
+
+KEYWORD_HISTORY = KeywordHistory(
+    KEYWORD_HISTORY_DB_FILE, KEYWORD_HISTORY_MAX_AGE, KEYWORD_HISTORY_RETENTION_DAYS
+)
+
+
+# ==========================
+# 리포트 스냅샷 (이전 리포트 대비 증감)
+# ==========================
+def snapshot_key(preset, base_keywords):
+    """
+    비교 단위: 정규화한 기준 키워드 목록 (프리셋을 골랐으면 프리셋 이름도 함께).
+    프리셋을 불러와 키워드를 고친 리포트가 원래 프리셋의 스냅샷과 섞이지 않도록 키워드 목록은 항상 넣는다.
+    """
+    normalized = sorted({"".join(k.split()).lower() for k in base_keywords})
+    digest = hashlib.sha1(",".join(normalized).encode("utf-8")).hexdigest()
+    if preset:
+        return f"preset:{preset}:{digest}"
+    return f"keywords:{digest}"
+
+
+class ReportSnapshots:
+    """
+    사용자/프리셋별로 리포트의 키워드 검색수를 날짜별 스냅샷으로 저장한다.
+    날짜는 리포트를 만든 날이 아니라 데이터를 API에서 조회한 날(fetched_at)이다.
+    같은 날짜로 다시 저장하면 그날 스냅샷을 덮어쓰고, previous()는 그 날짜 이전의
+    가장 최근 스냅샷을 키워드 인덱스 DataFrame으로 돌려준다.
+    """
+
+    def __init__(self, path, retention_days):
+        self.path = path
+        self.retention_days = retention_days
+        with closing(sqlite_connect(self.path)) as conn, conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS report_snapshots ("
+                "id INTEGER PRIMARY KEY, user_id TEXT NOT NULL, snapshot_key TEXT NOT NULL, "
+                "date TEXT NOT NULL, created_at REAL NOT NULL, "
+                "UNIQUE (user_id, snapshot_key, date))"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS report_snapshot_rows ("
+                "snapshot_id INTEGER NOT NULL, keyword TEXT NOT NULL, "
+                "pc INTEGER NOT NULL, mobile INTEGER NOT NULL, total INTEGER NOT NULL, "
+                "PRIMARY KEY (snapshot_id, keyword)) WITHOUT ROWID"
+            )
+
+    def save(self, user_id, key, df_all, fetched_at):
+        today = datetime.fromtimestamp(fetched_at).strftime("%Y-%m-%d")
+        # 같은 키워드가 여러 기준 키워드에서 나와도 검색수는 같으므로 첫 행만 저장
+        df = df_all.drop_duplicates("키워드")
+        rows = zip(
+            df["키워드"].tolist(),
+            df["PC 검색수"].tolist(),
+            df["모바일 검색수"].tolist(),
+            df["총 검색수"].tolist(),
+        )
+        cutoff = datetime.fromtimestamp(
+            time.time() - self.retention_days * 86400
+        ).strftime("%Y-%m-%d")
+        with closing(sqlite_connect(self.path)) as conn, conn:
+            old_ids = conn.execute(
+                "SELECT id FROM report_snapshots WHERE (user_id = ? AND snapshot_key = ? "
+                "AND date = ?) OR date < ?",
+                (user_id, key, today, cutoff),
+            ).fetchall()
+            conn.executemany(
+                "DELETE FROM report_snapshot_rows WHERE snapshot_id = ?", old_ids
+            )
+            conn.executemany("DELETE FROM report_snapshots WHERE id = ?", old_ids)
+            snapshot_id = conn.execute(
+                "INSERT INTO report_snapshots (user_id, snapshot_key, date, created_at) "
+                "VALUES (?, ?, ?, ?)",
+                (user_id, key, today, time.time()),
+            ).lastrowid
+            conn.executemany(
+                "INSERT INTO report_snapshot_rows VALUES (?, ?, ?, ?, ?)",
+                ((snapshot_id, *row) for row in rows),
+            )
+
+    def previous(self, user_id, key, fetched_at):
+        """fetched_at 날짜 이전의 가장 최근 스냅샷 → (날짜, 키워드 인덱스 DataFrame) (없으면 (None, None))"""
+        today = datetime.fromtimestamp(fetched_at).strftime("%Y-%m-%d")
+        with closing(sqlite_connect(self.path)) as conn:
+            row = conn.execute(
+                "SELECT id, date FROM report_snapshots "
+                "WHERE user_id = ? AND snapshot_key = ? AND date < ? "
+                "ORDER BY date DESC LIMIT 1",
+                (user_id, key, today),
+            ).fetchone()
+            if row is None:
+                return None, None
+            rows = conn.execute(
+                "SELECT keyword, pc, mobile, total FROM report_snapshot_rows "
+                "WHERE snapshot_id = ?",
+                (row[0],),
+            ).fetchall()
+        prev = pd.DataFrame(
+            rows, columns=["키워드", "PC 검색수", "모바일 검색수", "총 검색수"]
+        ).set_index("키워드")
+        return row[1], prev
+
+
+REPORT_SNAPSHOTS = ReportSnapshots(KEYWORD_HISTORY_DB_FILE, KEYWORD_HISTORY_RETENTION_DAYS)
+
+
+# ==========================
+# 계정 / 프리셋 저장소 (SQLite)
+# ==========================
+PRESET_FILE_RE = re.compile(r"^presets_(.+)\.json$")
+
+
+class AccountStore:
+    """
+    계정, 계정별 프리셋, 공용 프리셋(keyword_presets.json)을 SQLite에 저장한다.
+    변경은 행 단위 트랜잭션이라 여러 워커가 동시에 수정해도 서로 덮어쓰지 않는다.
+    처음 열 때 기존 JSON 파일(accounts.json, presets_<id>.json, keyword_presets.json)을 한 번만 가져온다.
+    조회는 메모리 사본으로 처리하고, check_interval(초)마다 PRAGMA data_version으로
+    다른 연결(다른 워커 포함)의 변경을 확인해 바뀌었을 때만 다시 읽는다.
+    이 프로세스에서 쓴 변경은 바로 다음 조회부터 반영된다.
+    """
+
+    def __init__(self, path, check_interval, json_dir="."):
+        self.path = path
+        self.check_interval = check_interval
+        self.lock = threading.Lock()
+        self._data = None  # (accounts, presets, shared)
+        self._version = None
+        self._checked_at = 0.0
+        with closing(sqlite_connect(self.path)) as conn, conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS accounts ("
+                "user_id TEXT PRIMARY KEY, password TEXT NOT NULL, name TEXT NOT NULL, "
+                "region TEXT NOT NULL DEFAULT '', industry TEXT NOT NULL DEFAULT '')"
+            )
+            # (user_id, name) 기본 키가 user_id 조회 인덱스 역할도 한다
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS presets ("
+                "user_id TEXT NOT NULL, name TEXT NOT NULL, keywords TEXT NOT NULL, "
+                "updated_at REAL NOT NULL, PRIMARY KEY (user_id, name))"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS shared_presets ("
+                "name TEXT PRIMARY KEY, keywords TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+            )
+        self.import_json_files(json_dir)
+        # data_version은 같은 연결에서 봐야 하므로 변경 확인용 연결을 하나 유지
+        self._watch = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+
+    @staticmethod
+    def _read_json(path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception:
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def import_json_files(self, json_dir):
+        """기존 JSON 파일을 가져온다 (이미 가져왔으면 아무것도 하지 않음)"""
+        with closing(sqlite_connect(self.path)) as conn:
+            # 여러 워커가 동시에 시작해도 한 곳에서만 가져오도록 쓰기 잠금부터 잡는다
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if conn.execute(
+                    "SELECT 1 FROM meta WHERE key = 'json_imported'"
+                ).fetchone():
+                    conn.rollback()
+                    return
+                now = time.time()
+                accounts = self._read_json(os.path.join(json_dir, ACCOUNTS_FILE))
+                conn.executemany(
+                    "INSERT OR IGNORE INTO accounts VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (
+                            uid,
+                            str(info.get("password", "")),
+                            info.get("name", uid),
+                            info.get("region", ""),
+                            info.get("industry", ""),
+                        )
+                        for uid, info in accounts.items()
+                        if isinstance(info, dict)
+                    ],
+                )
+                for fname in sorted(os.listdir(json_dir)):
+                    m = PRESET_FILE_RE.match(fname)
+                    if not m:
+                        continue
+                    presets = self._read_json(os.path.join(json_dir, fname))
+                    conn.executemany(
+                        "INSERT OR IGNORE INTO presets VALUES (?, ?, ?, ?)",
+                        [(m.group(1), n, str(kw), now) for n, kw in presets.items()],
+                    )
+                shared = self._read_json(os.path.join(json_dir, SHARED_PRESETS_FILE))
+                conn.executemany(
+                    "INSERT OR IGNORE INTO shared_presets VALUES (?, ?, ?)",
+                    [(n, str(kw), now) for n, kw in shared.items()],
+                )
+                conn.execute(
+                    "INSERT INTO meta VALUES ('json_imported', ?)",
+                    (datetime.now().isoformat(timespec="seconds"),),
+                )
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+
+    # ---- 메모리 사본 ----
+    def _snapshot(self):
+        now = time.monotonic()
+        data = self._data
+        if data is not None and now - self._checked_at < self.check_interval:
+            return data
+        with self.lock:
+            version = self._watch.execute("PRAGMA data_version").fetchone()[0]
+            if self._data is None or version != self._version:
+                accounts = {
+                    uid: dict(zip(("password", "name", "region", "industry"), rest))
+                    for uid, *rest in self._watch.execute(
+                        "SELECT user_id, password, name, region, industry "
+                        "FROM accounts ORDER BY rowid"
+                    )
+                }
+                presets = {}
+                for uid, name, keywords in self._watch.execute(
+                    "SELECT user_id, name, keywords FROM presets ORDER BY rowid"
+                ):
+                    presets.setdefault(uid, {})[name] = keywords
+                shared = dict(
+                    self._watch.execute(
+                        "SELECT name, keywords FROM shared_presets ORDER BY rowid"
+                    )
+                )
+                self._data = (accounts, presets, shared)
+                self._version = version
+            self._checked_at = now
+            return self._data
+
+    def _changed(self):
+        """이 프로세스에서 쓴 변경은 확인 주기를 기다리지 않고 다음 조회에서 다시 읽는다"""
+        with self.lock:
+            self._data = None
+
+    # ---- 계정 ----
+    def get_account(self, user_id):
+        info = self._snapshot()[0].get(user_id)
+        return dict(info) if info else None
+
+    def list_accounts(self):
+        """{ user_id: {name, region, industry} } (추가한 순서)"""
+        return {
+            uid: {k: info[k] for k in ("name", "region", "industry")}
+            for uid, info in self._snapshot()[0].items()
+        }
+
+    def add_account(self, user_id, password, name, region="", industry=""):
+        """새 계정 추가. 이미 있는 아이디면 False"""
+        try:
+            with closing(sqlite_connect(self.path)) as conn, conn:
+                conn.execute(
+                    "INSERT INTO accounts VALUES (?, ?, ?, ?, ?)",
+                    (user_id, password, name, region, industry),
+                )
+        except sqlite3.IntegrityError:
+            return False
+        self._changed()
+        return True
+
+    def delete_account(self, user_id):
+        """계정과 그 계정의 프리셋을 함께 삭제. 없는 계정이면 False"""
+        with closing(sqlite_connect(self.path)) as conn, conn:
+            deleted = conn.execute(
+                "DELETE FROM accounts WHERE user_id = ?", (user_id,)
+            ).rowcount
+            conn.execute("DELETE FROM presets WHERE user_id = ?", (user_id,))
+        self._changed()
+        return deleted > 0
+
+    # ---- 프리셋 ----
+    def presets(self, user_id):
+        """{ 프리셋 이름: 키워드 문자열 } (저장한 순서, 호출한 쪽이 수정해도 되는 복사본)"""
+        return dict(self._snapshot()[1].get(user_id, {}))
+
+    def save_preset(self, user_id, name, keywords):
+        # 같은 이름이면 키워드만 바꾸고 목록 순서는 유지
+        with closing(sqlite_connect(self.path)) as conn, conn:
+            conn.execute(
+                "INSERT INTO presets VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (user_id, name) DO UPDATE SET "
+                "keywords = excluded.keywords, updated_at = excluded.updated_at",
+                (user_id, name, keywords, time.time()),
+            )
+        self._changed()
+
+    def delete_preset(self, user_id, name):
+        with closing(sqlite_connect(self.path)) as conn, conn:
+            deleted = conn.execute(
+                "DELETE FROM presets WHERE user_id = ? AND name = ?", (user_id, name)
+            ).rowcount
+        self._changed()
+        return deleted > 0
+
+    def shared_presets(self):
+        """공용 프리셋 (keyword_presets.json 에서 가져온 것)"""
+        return dict(self._snapshot()[2])
+
+
+STORE = AccountStore(APP_DB_FILE, CONFIG_CHECK_INTERVAL)
+
+
 # ==========================
 # 유틸 함수
 # ==========================
-def fetch_keyword_stats(base_keyword):
-    """네이버 검색광고 키워드 도구 호출"""
+def request_keywordstool(hint_keywords):
+    """keywordstool 1회 호출 (힌트 키워드는 최대 5개까지 쉼표로 묶어 전송)"""
     uri = "/keywordstool"
-    headers = get_headers("GET", uri)
-    params = {"hintKeywords": base_keyword, "showDetail": "1"}
-    res = requests.get(BASE_URL + uri, headers=headers, params=params, timeout=10)
-    res.raise_for_status()
+    params = {"hintKeywords": ",".join(hint_keywords), "showDetail": "1"}
+    res = HTTP.get(
+        BASE_URL + uri,
+        "keywordstool",
+        params=params,
+        headers=lambda: get_headers("GET", uri),
+        bucket=KEYWORD_API_BUCKET,
+    )
     return res.json().get("keywordList", [])
 
 
-def check_blog_duplication(full_text):
+def _bigrams(text):
+    return {text[i:i + 2] for i in range(len(text) - 1)} or {text}
+
+
+def batch_shared_label(hint_keywords):
+    """묶음 호출 결과 중 어느 기준 키워드에도 속하지 않는 연관 키워드의 출처 이름"""
+    return "공통(" + "/".join(hint_keywords) + ")"
+
+
+def split_batch_items(hint_keywords, items):
     """
-    원고를 받아 문장을 추출하고, 네이버에 검색하여 중복 여부를 확인
+    묶음 호출 결과(keywordList)를 기준 키워드별 목록으로 나눈다 (표시/집계용, 캐시에는 묶음 전체를 저장).
+    연관 키워드 하나는 한 곳에만 넣는다 (공백/대소문자 무시):
+    - 힌트와 똑같으면 그 힌트
+    - 아니면 글자 2-gram이 가장 많이 겹치는 힌트 (동점이면 정규화한 힌트 문자열이 앞서는 쪽)
+    - 어느 힌트와도 겹치지 않으면 batch_shared_label() 묶음 공통 목록 (비어 있으면 키가 없음)
+    결과가 묶음 안의 힌트 순서에 따라 달라지지 않는다.
     """
-    # 1. 문장 분리 (줄바꿈 및 마침표 기준)
-    # 너무 짧은 문장(15자 미만)은 검사 의미가 없으므로 제외
-    sentences = [
-        s.strip()
-        for s in full_text.replace("\n", ".").split(".")
-        if len(s.strip()) > 15
+    if len(hint_keywords) == 1:
+        return {hint_keywords[0]: list(items)}
+    hints = sorted(
+        ("".join(h.split()).lower(), h) for h in hint_keywords
+    )
+    grams = [(norm, _bigrams(norm), h) for norm, h in hints]
+    split = {h: [] for h in hint_keywords}
+    shared = []
+
+    for item in items:
+        rel = "".join(str(item.get("relKeyword") or "").split()).lower()
+        owner = next((h for norm, h in hints if norm == rel), None)
+        if owner is None:
+            rel_grams = _bigrams(rel)
+            best = 0
+            for _, g, h in grams:
+                overlap = len(rel_grams & g)
+                if overlap > best:
+                    best, owner = overlap, h
+        if owner is None:
+            shared.append(item)
+        else:
+            split[owner].append(item)
+    if shared:
+        split[batch_shared_label(hint_keywords)] = shared
+    return split
+
+
+def fetch_keyword_batch(hint_keywords):
+    """힌트 키워드 묶음(최대 5개)을 1회 호출로 조회해 묶음 전체 응답을 캐시와 이력에 저장하고 키워드별로 나눔"""
+    label = ",".join(hint_keywords)
+    items = request_keywordstool(hint_keywords)
+    KEYWORD_CACHE.set(keyword_cache_key(label), items)
+    KEYWORD_HISTORY.record({label: items})
+    return split_batch_items(hint_keywords, items)
+
+
+def load_keyword_batch(hint_keywords, use_cache=True):
+    """같은 묶음의 캐시/최근 이력이 있으면 그것을, 없으면 새로 조회해 키워드별로 나눈 결과"""
+    if use_cache:
+        label = ",".join(hint_keywords)
+        cached = KEYWORD_CACHE.get(keyword_cache_key(label))
+        if cached is None:
+            cached = KEYWORD_HISTORY.latest(label)
+        if cached is not None:
+            return split_batch_items(hint_keywords, cached)
+    return fetch_keyword_batch(hint_keywords)
+
+
+def fetch_keyword_stats(base_keyword, use_cache=True):
+    """네이버 검색광고 키워드 도구 호출 (use_cache=False 면 캐시/이력을 건너뛰고 새로 조회)"""
+    if use_cache:
+        cached = KEYWORD_CACHE.get(keyword_cache_key(base_keyword))
+        if cached is None:
+            cached = KEYWORD_HISTORY.latest(base_keyword)
+        if cached is not None:
+            return cached
+    return fetch_keyword_batch([base_keyword])[base_keyword]
+
+
+class KeywordColumns:
+    """
+    keywordstool 결과를 열 단위 버퍼에 바로 쌓는 리포트 데이터.
+    검색수는 int32, 경쟁도/평균 노출 광고수는 float64(없으면 NaN) 배열,
+    경쟁도(텍스트)와 기준 키워드 출처는 카테고리 코드로 저장하고
+    to_frame()에서 복사 없이 DataFrame 열로 넘긴다.
+    """
+
+    def __init__(self):
+        self.keyword = []
+        self.pc = array("i")
+        self.mo = array("i")
+        self.total = array("i")
+        self.depth = array("d")
+        self.comp = array("d")
+        self.comp_text_codes = array("i")
+        self.source_codes = array("i")
+        self.comp_text_categories = {}
+        self.source_categories = {}
+        self.fetched_at = {}  # { 기준 키워드: 데이터를 API에서 조회한 시각 }
+
+    def __len__(self):
+        return len(self.keyword)
+
+    @staticmethod
+    def _code(categories, value):
+        if value is None:
+            return -1
+        return categories.setdefault(value, len(categories))
+
+    def extend(self, base, items):
+        """기준 키워드 1개의 keywordList를 버퍼에 추가"""
+        source_code = self._code(self.source_categories, base)
+        for item in items:
+            rel = item.get("relKeyword")
+            if not rel:
+                continue
+            pc = to_int(item.get("monthlyPcQcCnt"))
+            mo = to_int(item.get("monthlyMobileQcCnt"))
+            comp_text = item.get("compIdx")
+            comp_score = parse_competition(comp_text)
+            depth = to_float(item.get("plAvgDepth"))
+
+            self.keyword.append(rel)
+            self.pc.append(pc)
+            self.mo.append(mo)
+            self.total.append(pc + mo)
+            self.depth.append(NAN if depth is None else depth)
+            self.comp.append(NAN if comp_score is None else comp_score)
+            self.comp_text_codes.append(self._code(self.comp_text_categories, comp_text))
+            self.source_codes.append(source_code)
+
+    def to_frame(self):
+        def categorical(codes, categories):
+            return pd.Categorical.from_codes(
+                np.frombuffer(codes, dtype=np.int32), categories=list(categories)
+            )
+
+        return pd.DataFrame(
+            {
+                "키워드": self.keyword,
+                "PC 검색수": np.frombuffer(self.pc, dtype=np.int32),
+                "모바일 검색수": np.frombuffer(self.mo, dtype=np.int32),
+                "총 검색수": np.frombuffer(self.total, dtype=np.int32),
+                "평균 노출 광고수": np.frombuffer(self.depth, dtype=np.float64),
+                "경쟁도": np.frombuffer(self.comp, dtype=np.float64),
+                "경쟁도(텍스트)": categorical(
+                    self.comp_text_codes, self.comp_text_categories
+                ),
+                "기준 키워드 출처": categorical(
+                    self.source_codes, self.source_categories
+                ),
+            },
+            copy=False,
+        )
+
+
+def collect_keyword_rows(base_keywords, use_cache=True, on_base=None):
+    """
+    기준 키워드별 keywordstool 결과를 모아 (KeywordColumns, 실패한 기준 키워드 목록)을 반환한다.
+    단독 조회 캐시/최근 이력(KEYWORD_HISTORY_MAX_AGE)이 없는 키워드만 KEYWORD_BATCH_SIZE개씩 묶어
+    (같은 묶음의 캐시가 있으면 재사용) 스레드 풀에서 병렬 호출하고,
+    호출 간격은 KEYWORD_API_BUCKET(초당 KEYWORD_FETCH_RPS회)으로 제한한다.
+    재시도 후에도 실패한 묶음은 건너뛰고, 결과 행은 입력한 기준 키워드 순서대로 이어 붙인다.
+    on_base(base, items, error)는 기준 키워드 하나의 결과가 나올 때마다(완료 순서) 호출된다.
+    기준 키워드별 데이터 조회 시각(캐시/이력이면 원래 조회한 시각)은 rows.fetched_at에 담는다.
+    """
+    notify = on_base or (lambda base, items, error=None: None)
+
+    if not base_keywords:
+        return KeywordColumns(), []
+
+    results = {}
+    sources = {}  # { 기준 키워드: 결과를 가져온 캐시/이력 키 (기준 키워드 또는 묶음 라벨) }
+    missing = []
+    for base in dict.fromkeys(base_keywords):
+        cached = None
+        if use_cache:
+            cached = KEYWORD_CACHE.get(keyword_cache_key(base))
+            if cached is None:
+                cached = KEYWORD_HISTORY.latest(base)
+        if cached is None:
+            missing.append(base)
+        else:
+            results[base] = cached
+            sources[base] = base
+            notify(base, cached)
+
+    batches = [
+        missing[i:i + KEYWORD_BATCH_SIZE]
+        for i in range(0, len(missing), KEYWORD_BATCH_SIZE)
     ]
+    failed = []
+    if batches:
+        workers = max(1, min(KEYWORD_FETCH_WORKERS, len(batches)))
+        with ThreadPoolExecutor(max_workers=workers) as ex:
+            futures = {
+                ex.submit(load_keyword_batch, batch, use_cache): batch for batch in batches
+            }
+            for fut in as_completed(futures):
+                batch = futures[fut]
+                try:
+                    split = fut.result()
+                except Exception as e:
+                    failed.extend(batch)
+                    for base in batch:
+                        notify(base, None, str(e))
+                    continue
+                results.update(split)
+                for base in batch:
+                    sources[base] = ",".join(batch)
+                    notify(base, split[base])
+                shared = batch_shared_label(batch)
+                if shared in split:
+                    sources[shared] = ",".join(batch)
+
+    rows = KeywordColumns()
+    for base in base_keywords:
+        rows.extend(base, results.get(base, []))
+    # 묶음 호출에서 어느 기준 키워드에도 속하지 않은 연관 키워드는 묶음별 공통 출처로 한 번만
+    for batch in batches:
+        shared = batch_shared_label(batch)
+        if shared in results:
+            rows.extend(shared, results[shared])
+    # 조회한 응답은 모두 이력에도 남으므로 이력의 최근 조회 시각이 곧 데이터의 조회 시각
+    times = KEYWORD_HISTORY.fetched_times(set(sources.values()))
+    rows.fetched_at = {
+        base: times[label] for base, label in sources.items() if label in times
+    }
+    return rows, failed
 
-    if not sentences:
-        return None, "검사할 수 있는 긴 문장이 없습니다. (15자 이상)"
 
-    # 2. 랜덤으로 3~5개 문장 추출
-    check_count = min(5, len(sentences))
-    target_sentences = random.sample(sentences, check_count)
+# 네이버 봇 차단 방지용 헤더
+SEARCH_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/110.0.0.0 Safari/537.36"
+}
+SEARCH_URL = "https://search.naver.com/search.naver"
 
-    results = []
+# search.naver.com 호출은 모든 사용자가 하나의 버킷을 공유 (전체 합산 초당 요청 수 제한)
+SEARCH_BUCKET = TokenBucket(DUP_CHECK_RPS)
 
-    # 네이버 봇 차단 방지용 헤더
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/110.0.0.0 Safari/537.36"
-    }
+SENTENCE_CACHE = SqliteCache(
+    CACHE_DB_FILE, "sentence_cache", DUP_CACHE_TTL, DUP_CACHE_MAX_ENTRIES
+)
 
-    base_search_url = "https://search.naver.com/search.naver"
 
-    for sent in target_sentences:
-        # 3. 정확도 검사를 위해 따옴표("")로 감싸서 검색 (Exact Match)
-        query = f'"{sent}"'
-        params = {"query": query, "where": "view"}  # where=view (블로그/카페 탭)
+def sentence_cache_key(sent):
+    """공백을 정리한 문장의 SHA-256 해시"""
+    normalized = " ".join(sent.split())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
 
-        try:
-            resp = requests.get(base_search_url, headers=headers, params=params, timeout=5)
-            soup = BeautifulSoup(resp.text, "html.parser")
 
-            # 4. 결과 분석
-            # '검색결과가 없습니다' 문구가 뜨거나, 리스트가 비어있으면 안전
-            # 네이버 뷰탭 클래스 구조에 따라 다르지만, 보통 결과 없으면 특정 문구가 뜸
-            text_body = soup.text
+# 네이버 검색 결과 페이지 판정용 패턴
+NO_RESULT_MARKER = "검색결과가 없습니다"
+SEARCH_HIT_TAG_RE = re.compile(
+    r'<a\s([^>]*\bclass="[^"]*\b(?:title_link|total_tit)\b[^"]*"[^>]*)>(.*?)</a>',
+    re.S,
+)
+HREF_RE = re.compile(r'\bhref="([^"]*)"')
+TAG_RE = re.compile(r"<[^>]+>")
 
-            if "검색결과가 없습니다" in text_body:
-                status = "안전 (Unique)"
-                is_safe = True
-            else:
-                # 결과가 있으면 중복 의심
-                status = "중복 발견 (Dangerous)"
-                is_safe = False
-
-            results.append({
-                "sentence": sent,
-                "status": status,
-                "is_safe": is_safe
-            })
 
-            # 과도한 요청 방지
-            time.sleep(0.5)
+def detect_search_results(page, max_hits=3):
+    """
+    검색 결과 HTML 원문을 파싱하지 않고 훑어서 (결과 있음 여부, 상위 결과 목록)을 반환.
+    결과 목록은 [{"title": ..., "url": ...}] 형태로 최대 max_hits개.
+    """
+    if NO_RESULT_MARKER in page:
+        return False, []
+
+    hits = []
+    for m in SEARCH_HIT_TAG_RE.finditer(page):
+        href = HREF_RE.search(m.group(1))
+        title = html.unescape(TAG_RE.sub("", m.group(2))).strip()
+        if href and title:
+            hits.append({"title": title, "url": html.unescape(href.group(1))})
+            if len(hits) >= max_hits:
+                break
+    return True, hits
+
+
+def check_sentence(sent):
+    """문장 1개를 따옴표 검색해서 중복 여부 판정 (캐시된 판정이 있으면 재사용)"""
+    cache_key = sentence_cache_key(sent)
+    cached = SENTENCE_CACHE.get(cache_key)
+    if cached is not None:
+        return {"sentence": sent, "cached": True, **cached}
+
+    # 정확도 검사를 위해 따옴표("")로 감싸서 검색 (Exact Match)
+    query = f'"{sent}"'
+    params = {"query": query, "where": "view"}  # where=view (블로그/카페 탭)
+
+    try:
+        resp = HTTP.get(
+            SEARCH_URL, "search", params=params, headers=SEARCH_HEADERS, bucket=SEARCH_BUCKET
+        )
+        # '검색결과가 없습니다' 문구가 뜨면 안전, 아니면 중복 의심 (상위 결과 링크 함께 수집)
+        has_results, matches = detect_search_results(resp.text)
+
+        if not has_results:
+            status = "안전 (Unique)"
+            is_safe = True
+        else:
+            # 결과가 있으면 중복 의심
+            status = "중복 발견 (Dangerous)"
+            is_safe = False
+
+        # 실패한 검사는 캐시하지 않음 (다음 검사 때 다시 시도)
+        SENTENCE_CACHE.set(
+            cache_key, {"status": status, "is_safe": is_safe, "matches": matches}
+        )
+
+    except Exception:
+        status = "검사 실패 (Error)"
+        is_safe = False
+        matches = []
+
+    return {
+        "sentence": sent,
+        "status": status,
+        "is_safe": is_safe,
+        "matches": matches,
+        "cached": False,
+    }
 
-        except Exception as e:
-            results.append({
-                "sentence": sent,
-                "status": "검사 실패 (Error)",
-                "is_safe": False
-            })
 
-    return results, None
+def select_dup_sentences(full_text, sample_size=DUP_CHECK_SAMPLE_SIZE, full_scan=False):
+    """
+    원고에서 검사할 문장을 골라 (문장 목록, 검사 대상이 되는 전체 문장 수, 오류 메시지)로 반환
+    - 기본: sample_size개 문장을 무작위로 골라 원고 내 순서대로
+    - full_scan=True: 15자 초과 문장 전체(중복 문장 제외, 앞에서부터 최대 DUP_FULL_SCAN_MAX개)
+    """
+    # 1. 문장 분리 (줄바꿈 및 마침표 기준)
+    # 너무 짧은 문장(15자 미만)은 검사 의미가 없으므로 제외
+    sentences = list(dict.fromkeys(
+        s.strip()
+        for s in full_text.replace("\n", ".").split(".")
+        if len(s.strip()) > 15
+    ))
+
+    if not sentences:
+        return None, 0, "검사할 수 있는 긴 문장이 없습니다. (15자 이상)"
+
+    # 2. 검사 대상 선정 (전체 또는 랜덤 sample_size개)
+    if full_scan:
+        return sentences[:DUP_FULL_SCAN_MAX], len(sentences), None
+    sample_size = max(1, min(DUP_CHECK_MAX_SAMPLE, sample_size))
+    picked = random.sample(range(len(sentences)), min(sample_size, len(sentences)))
+    return [sentences[i] for i in sorted(picked)], len(sentences), None
+
+
+def check_sentences(sentences, on_result=None):
+    """
+    문장들을 병렬로 검사 (요청 속도는 SEARCH_BUCKET으로 제한)
+    on_result(result)는 문장 1개 검사가 끝날 때마다 호출되고, 반환값은 입력 순서 그대로
+    """
+    results = [None] * len(sentences)
+    workers = max(1, min(DUP_CHECK_WORKERS, len(sentences)))
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        futures = {ex.submit(check_sentence, sent): i for i, sent in enumerate(sentences)}
+        for fut in as_completed(futures):
+            results[futures[fut]] = fut.result()
+            if on_result:
+                on_result(results[futures[fut]])
+    return results
+
+
+def dup_cache_stats(results):
+    """문장 캐시 현황 + 이번 검사에서 캐시로 처리한/새로 검색한 문장 수"""
+    stats = SENTENCE_CACHE.stats()
+    stats["cached"] = sum(1 for r in results if r["cached"])
+    stats["searched"] = len(results) - stats["cached"]
+    return stats
+
+
+def summarize_duplication(results, eligible=None):
+    """
+    검사 결과 요약: 안전/중복/실패 문장 수와 독창성(안전 문장 비율, 실패 제외).
+    eligible은 원고에서 검사 대상이 되는 전체 문장 수 (검사한 문장 수보다 많으면 일부만 검사한 것).
+    """
+    failed = sum(1 for r in results if r["status"] == "검사 실패 (Error)")
+    safe = sum(1 for r in results if r["is_safe"])
+    checked = len(results) - failed
+    return {
+        "total": len(results),
+        "eligible": max(eligible or 0, len(results)),
+        "safe": safe,
+        "duplicate": checked - safe,
+        "failed": failed,
+        "originality": round(100 * safe / checked, 1) if checked else None,
+    }
 
 
 def to_int(v):
@@ -266,6 +1341,9 @@ def to_int(v):
         return 0
 
 
+NAN = float("nan")
+
+
 def to_float(v):
     try:
         return float(v)
@@ -494,6 +1572,7 @@ LOGIN_HTML = """
 </body>
 </html>
 """
+LOGIN_TEMPLATE = app.jinja_env.from_string(LOGIN_HTML)  # 시작 시 한 번만 컴파일
 
 
 @app.route("/login", methods=["GET", "POST"])
@@ -501,14 +1580,14 @@ def login():
     if request.method == "POST":
         uid = request.form.get("username", "").strip()
         pw = request.form.get("password", "").strip()
-        user = ACCOUNTS.get(uid)
+        user = STORE.get_account(uid)
         if user and user["password"] == pw:
             session["user"] = uid
             session["name"] = user.get("name", uid)
             return redirect("/")
-        return render_template_string(LOGIN_HTML, msg="아이디 또는 비밀번호가 올바르지 않습니다.", datetime=datetime)
+        return render_template(LOGIN_TEMPLATE, msg="아이디 또는 비밀번호가 올바르지 않습니다.", datetime=datetime)
 
-    return render_template_string(LOGIN_HTML, msg=None, datetime=datetime)
+    return render_template(LOGIN_TEMPLATE, msg=None, datetime=datetime)
 
 
 @app.route("/logout")
@@ -520,21 +1599,13 @@ def logout():
 # ==========================
 # 프리셋 (계정별)
 # ==========================
-def preset_file():
-    return f"presets_{session['user']}.json"
-
-
 def load_presets():
-    try:
-        with open(preset_file(), "r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception:
-        return {}
+    return STORE.presets(session["user"])
 
 
-def save_presets(data):
-    with open(preset_file(), "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+def split_keywords(text):
+    """쉼표로 구분한 기준 키워드 문자열 → 목록"""
+    return [k.strip() for k in text.split(",") if k.strip()]
 
 
 # ==========================
@@ -738,6 +1809,15 @@ MAIN_HTML = """
             <option value="comp" {% if sort_by == 'comp' %}selected{% endif %}>경쟁도 낮은순</option>
           </select>
         </div>
+        <div><label>그래프 키워드 수</label><input type="number" name="chart_top" min="1" max="{{ chart_top_max }}" value="{{ chart_top }}"></div>
+      </div>
+      <div style="display:flex; flex-wrap:wrap; gap:16px; margin-bottom:12px;">
+        <label style="display:flex; align-items:center; gap:6px; font-weight:500; margin:0;">
+          <input type="checkbox" name="no_cache" value="1" style="width:auto;" {% if no_cache %}checked{% endif %}> 캐시 무시하고 새로 조회
+        </label>
+        <label style="display:flex; align-items:center; gap:6px; font-weight:500; margin:0;">
+          <input type="checkbox" name="dedupe" value="1" style="width:auto;" {% if dedupe %}checked{% endif %}> 기준 키워드 간 중복 키워드 합치기
+        </label>
       </div>
       <button name="action" value="generate" class="btn btn-primary">🚀 데이터 분석 시작</button>
 
@@ -745,7 +1825,7 @@ MAIN_HTML = """
         <div class="preset-header">
           <span>📂 저장된 프리셋</span>
           <div style="display:flex; gap:6px;">
-            <select name="preset" style="padding: 6px;"><option value="">-- 선택 --</option>{% for n in presets %}<option value="{{n}}" {% if n == selected %}selected{% endif %}>{{n}}</option>{% endfor %}</select>
+            <select name="preset" style="padding: 6px;"><option value="">-- 선택 --</option>{% for n in presets %}<option value="{{n}}" {% if n == selected %}selected{% endif %}>{{n}}</option>{% endfor %}{% if shared_presets %}<optgroup label="공용 프리셋">{% for n in shared_presets if n not in presets %}<option value="{{n}}" {% if n == selected %}selected{% endif %}>{{n}}</option>{% endfor %}</optgroup>{% endif %}</select>
             <button type="submit" name="action" value="load" class="btn btn-outline">적용</button>
             <button type="submit" name="action" value="delete_preset" class="btn btn-outline btn-danger" onclick="return confirm('삭제?');">삭제</button>
           </div>
@@ -758,10 +1838,112 @@ MAIN_HTML = """
     </div>
   </form>
 
+  {% if job %}
+  <div class="card" id="job-card">
+    {% if job.kind == "dup" %}
+    <div class="card-title">⏳ 원고 중복 검사 중</div>
+    <div style="font-size:13px; color:var(--text-sub); margin-bottom:8px;">
+      문장 <strong id="job-done">{{ job.done }}</strong> / {{ job.total }}개 검사 완료
+    </div>
+    {% else %}
+    <div class="card-title">⏳ 리포트 생성 중</div>
+    <div style="font-size:13px; color:var(--text-sub); margin-bottom:8px;">
+      기준 키워드 <strong id="job-done">{{ job.done }}</strong> / {{ job.total }}개 수집 완료
+    </div>
+    {% endif %}
+    <div style="background:#e5e7eb; border-radius:6px; height:8px; overflow:hidden;">
+      <div id="job-bar" style="background:var(--accent); height:8px; width:{{ (100 * job.done / job.total) | round | int if job.total else 0 }}%;"></div>
+    </div>
+    <div class="table-container" style="margin-top:16px;">
+      <table>
+        {% if job.kind == "dup" %}
+        <thead><tr><th>문장</th><th>판정</th></tr></thead>
+        {% else %}
+        <thead><tr><th>기준 키워드</th><th>수집 수</th><th>상위 키워드</th></tr></thead>
+        {% endif %}
+        <tbody id="job-rows"></tbody>
+      </table>
+    </div>
+  </div>
+  <script>
+    (function () {
+      const bar = document.getElementById("job-bar");
+      const doneEl = document.getElementById("job-done");
+      const rows = document.getElementById("job-rows");
+      const finish = () => location.reload();
+      // 작업을 찾을 수 없으면(만료/삭제 등) 진행 카드를 안내 문구로 바꾸고 멈춘다
+      const fail = (text) => {
+        const div = document.createElement("div");
+        div.className = "alert";
+        div.textContent = text;
+        document.getElementById("job-card").replaceWith(div);
+      };
+      const progress = (ev, cells) => {
+        doneEl.textContent = ev.done;
+        bar.style.width = (ev.total ? 100 * ev.done / ev.total : 0) + "%";
+        const tr = document.createElement("tr");
+        cells.forEach(text => {
+          const td = document.createElement("td");
+          td.textContent = text;
+          tr.appendChild(td);
+        });
+        rows.appendChild(tr);
+      };
+
+      function poll() {
+        fetch("{{ url_for('job_status', job_id=job.id) }}")
+          .then(r => r.json().then(s => [r.ok, s]))
+          .then(([ok, s]) => {
+            if (!ok || !s.status) {
+              fail("작업 상태를 확인할 수 없습니다 (" + (s.error || "unknown") + "). 다시 실행해 주세요.");
+              return;
+            }
+            if (s.status === "done" || s.status === "error") { finish(); return; }
+            doneEl.textContent = s.done;
+            bar.style.width = (s.total ? 100 * s.done / s.total : 0) + "%";
+            setTimeout(poll, 1000);
+          })
+          .catch(() => setTimeout(poll, 2000));
+      }
+
+      if (!window.EventSource) { poll(); return; }
+
+      const es = new EventSource("{{ url_for('job_events', job_id=job.id) }}");
+      es.addEventListener("base", (e) => {
+        const ev = JSON.parse(e.data);
+        progress(ev, [
+          ev.base,
+          ev.error ? "조회 실패" : ev.count,
+          ev.error ? ev.error : ev.top.map(t => t.keyword + " (" + t.total.toLocaleString() + ")").join(", "),
+        ]);
+      });
+      es.addEventListener("sentence", (e) => {
+        const ev = JSON.parse(e.data);
+        progress(ev, [ev.sentence, ev.status]);
+      });
+      es.addEventListener("done", () => { es.close(); finish(); });
+      es.addEventListener("error", (e) => {
+        if (e.data) { es.close(); finish(); return; }
+        // 연결 자체가 거절되면(404 등) 다시 붙지 않으므로 상태 조회로 넘겨 원인을 표시
+        if (es.readyState === EventSource.CLOSED) poll();
+      });
+    })();
+  </script>
+  {% endif %}
+
   {% if msg %}
   <div class="alert">
     {{msg|safe}}
-    {% if downloadable %} <br><a href="{{ url_for('download') }}" style="margin-top:8px; display:inline-block;">📥 엑셀 다운로드</a> {% endif %}
+    {% if downloadable %}
+    <br><a href="{{ download_url or url_for('download') }}" style="margin-top:8px; display:inline-block;">📥 엑셀 다운로드</a>
+    {% if report_id %}
+    <span style="font-size:12px; margin-left:10px;">
+      {% for fmt, label in [('csv', 'CSV'), ('parquet', 'Parquet'), ('jsonl', 'JSON Lines')] %}
+      {{ label }}(<a href="{{ url_for('download', report=report_id, format=fmt) }}">전체</a>/<a href="{{ url_for('download', report=report_id, format=fmt, sheet='filtered') }}">필터</a>){% if not loop.last %} · {% endif %}
+      {% endfor %}
+    </span>
+    {% endif %}
+    {% endif %}
   </div>
   {% endif %}
 
@@ -782,10 +1964,30 @@ MAIN_HTML = """
     </div>
     {% endif %}
 
+    {% if trend_date %}
+    <h4 style="font-size:13px; margin-bottom:10px;">📈 {{ trend_date }} 리포트 대비 검색량 변화 (증가 {{ trend_counts.up }} · 감소 {{ trend_counts.down }} · 신규 {{ trend_counts.new }})</h4>
+    <div class="chart-grid" style="margin-bottom:30px;">
+      {% for title, rows in [("급상승 키워드", trend_up), ("감소 키워드", trend_down)] %}
+      <div class="table-container">
+        <table>
+          <thead><tr><th>{{ title }}</th><th>이전</th><th>현재</th><th>증감</th><th>증감률</th></tr></thead>
+          <tbody>
+            {% for row in rows %}
+            <tr><td>{{row["키워드"]}}</td><td>{{row["이전"]}}</td><td>{{row["현재"]}}</td><td style="color:{{ '#22c55e' if row['증감'] > 0 else '#ef4444' }};">{{ "%+d"|format(row["증감"]) }}</td><td>{{ "%+.1f%%"|format(row["증감률"]) if row["증감률"] is not none else "-" }}</td></tr>
+            {% else %}
+            <tr><td colspan="5">해당 키워드 없음</td></tr>
+            {% endfor %}
+          </tbody>
+        </table>
+      </div>
+      {% endfor %}
+    </div>
+    {% endif %}
+
     {% if chart_available %}
     <div class="chart-grid">
       <div class="chart-box">
-        <h4 style="font-size:13px; text-align:center; margin-bottom:10px;">검색량 Top 20</h4>
+        <h4 style="font-size:13px; text-align:center; margin-bottom:10px;">검색량 Top {{ chart_count }}</h4>
         <div style="position: relative; height:250px; width:100%;">
             <canvas id="volumeChart"></canvas>
         </div>
@@ -827,15 +2029,46 @@ MAIN_HTML = """
     <form method="post">
       <textarea name="blog_content" rows="6" placeholder="작성한 블로그 글 붙여넣기..." 
                 onfocus="this.style.borderColor='#3b82f6'" onblur="this.style.borderColor='#e5e7eb'">{{ blog_content or '' }}</textarea>
-      <button name="action" value="check_duplication" class="btn btn-primary" style="margin-top:12px;">🔍 중복 정밀 검사</button>
+      <div class="form-grid" style="margin-top:12px;">
+        <div><label>검사 문장 수 (최대 {{ dup_max_sample }})</label><input type="number" name="sample_size" min="1" max="{{ dup_max_sample }}" value="{{ dup_sample_size }}"></div>
+        <div style="display:flex; align-items:flex-end;">
+          <label style="display:flex; align-items:center; gap:6px; font-weight:500; margin-bottom:10px;">
+            <input type="checkbox" name="full_scan" value="1" style="width:auto;" {% if dup_full_scan %}checked{% endif %}> 전체 문장 검사 (샘플링 안 함, 앞에서부터 최대 {{ dup_full_scan_max }}문장)
+          </label>
+        </div>
+      </div>
+      <button name="action" value="check_duplication" class="btn btn-primary">🔍 중복 정밀 검사</button>
     </form>
     {% if dup_results %}
       <div style="margin-top:20px;">
         <h4 style="font-size:13px; font-weight:600; margin-bottom:12px;">검사 결과</h4>
+        {% if dup_summary %}
+        <p style="font-size:13px; margin:0 0 6px;">
+          독창성 <strong>{{ dup_summary.originality if dup_summary.originality is not none else '-' }}%</strong>
+          (검사 {{ dup_summary.total }}문장 / 검사 대상 {{ dup_summary.eligible }}문장: 안전 {{ dup_summary.safe }} / 중복 {{ dup_summary.duplicate }} / 실패 {{ dup_summary.failed }})
+        </p>
+        {% if dup_summary.eligible > dup_summary.total %}
+        <p style="font-size:12px; color:var(--text-sub); margin:0 0 6px;">
+          ⚠️ 원고의 검사 대상 {{ dup_summary.eligible }}문장 중 {{ dup_summary.total }}문장만 검사했습니다. 독창성은 검사한 문장 기준입니다.
+        </p>
+        {% endif %}
+        {% endif %}
+        {% if dup_cache_stats %}
+        <p style="font-size:12px; color:var(--text-sub); margin:0 0 10px;">
+          캐시 재사용 {{ dup_cache_stats.cached }}건 / 새로 검색 {{ dup_cache_stats.searched }}건
+          (누적 적중 {{ dup_cache_stats.hits }} / 미스 {{ dup_cache_stats.misses }})
+        </p>
+        {% endif %}
         {% for res in dup_results %}
         <div class="check-result-item {{ 'check-safe' if res.is_safe else 'check-danger' }}">
           <span class="tag {{ 'tag-safe' if res.is_safe else 'tag-danger' }}">{{ 'SAFE' if res.is_safe else 'WARNING' }}</span>
           "{{ res.sentence }}"
+          <span style="float:right; font-size:11px; color:var(--text-sub);">{{ res.status }}</span>
+          {% if res.matches %}
+          <ul style="margin:6px 0 0; padding-left:18px; font-size:12px;">
+            {% for m in res.matches %}<li><a href="{{ m.url }}" target="_blank" rel="noopener">{{ m.title }}</a></li>{% endfor %}
+          </ul>
+          {% endif %}
         </div>
         {% endfor %}
       </div>
@@ -857,10 +2090,13 @@ MAIN_HTML = """
   const pcData = {{ chart_pc|tojson }};
   const moData = {{ chart_mo|tojson }};
   const compData = {{ chart_comp|tojson }};
+  const prevData = {{ chart_prev|tojson }};
 
+  const volumeSets = [{ label: 'PC', data: pcData, backgroundColor: '#94a3b8' }, { label: 'Mobile', data: moData, backgroundColor: '#3b82f6' }];
+  {% if trend_date %}volumeSets.push({ type: 'line', label: '이전 총 검색수 ({{ trend_date }})', data: prevData, borderColor: '#f59e0b', backgroundColor: '#f59e0b', spanGaps: false });{% endif %}
   new Chart(document.getElementById('volumeChart'), {
     type: 'bar',
-    data: { labels: kwLabels, datasets: [{ label: 'PC', data: pcData, backgroundColor: '#94a3b8' }, { label: 'Mobile', data: moData, backgroundColor: '#3b82f6' }] },
+    data: { labels: kwLabels, datasets: volumeSets },
     options: commonOptions
   });
 
@@ -875,44 +2111,638 @@ MAIN_HTML = """
 </body>
 </html>
 """
+MAIN_TEMPLATE = app.jinja_env.from_string(MAIN_HTML)  # 시작 시 한 번만 컴파일
 
 
-@app.route("/", methods=["GET", "POST"])
-def index():
-    if "user" not in session:
-        return redirect("/login")
+# ==========================
+# 엑셀 리포트 (다운로드 시 생성)
+# ==========================
+def build_report_excel(df_all, df_filtered):
+    """엑셀 저장 (전체, 필터, 회사정보) → xlsx bytes"""
+    info_rows = [{"항목": k, "내용": v} for k, v in COMPANY_INFO.items()]
+    df_info = pd.DataFrame(info_rows)
+
+    out = BytesIO()
+    with pd.ExcelWriter(out, engine="openpyxl") as w:
+        df_all.to_excel(w, sheet_name="전체 키워드", index=False)
+        df_filtered.to_excel(w, sheet_name="필터 적용", index=False)
+        df_info.to_excel(
+            w,
+            sheet_name="전체 키워드",
+            startrow=len(df_all) + 2,
+            index=False,
+        )
+        df_info.to_excel(
+            w,
+            sheet_name="필터 적용",
+            startrow=len(df_filtered) + 2,
+            index=False,
+        )
+    return out.getvalue()
+
+
+def _excel_rows(df, chunk_size=10000):
+    """DataFrame 행을 openpyxl에 넣을 값 목록으로 (NaN → 빈 칸, chunk_size 행씩 변환)"""
+    for start in range(0, len(df), chunk_size):
+        chunk = df.iloc[start:start + chunk_size]
+        cols = [
+            chunk[c].astype(object).where(chunk[c].notna(), None).tolist()
+            for c in chunk.columns
+        ]
+        yield from zip(*cols)
+
+
+def write_report_excel_streaming(fileobj, df_all, df_filtered):
+    """
+    build_report_excel()과 같은 구성(시트 2개 + 회사정보 표)을 openpyxl write-only 모드로
+    fileobj에 쓴다. 행을 순서대로 흘려 쓰므로 리포트 크기와 관계없이 메모리 사용이 일정하다.
+    fileobj는 write()만 있으면 되고 seek 가능할 필요는 없다.
+    """
+    wb = Workbook(write_only=True)
+    for sheet_name, df in (("전체 키워드", df_all), ("필터 적용", df_filtered)):
+        ws = wb.create_sheet(sheet_name)
+        ws.append(list(df.columns))
+        for row in _excel_rows(df):
+            ws.append(row)
+        ws.append([])
+        ws.append(["항목", "내용"])
+        for k, v in COMPANY_INFO.items():
+            ws.append([k, v])
+    wb.save(fileobj)
+
+
+class _QueueWriter:
+    """write()로 받은 bytes를 크기 제한 큐에 넘기는 파일 객체 (응답 스트리밍용)"""
+
+    def __init__(self, q):
+        self.q = q
+        self.closed = False
+
+    def write(self, data):
+        if self.closed:
+            raise BrokenPipeError("download cancelled")
+        self.q.put(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+
+def stream_report_excel(df_all, df_filtered, max_chunks=64):
+    """별도 스레드에서 엑셀을 쓰면서 만들어지는 대로 bytes 조각을 내보내는 generator"""
+    q = queue.Queue(maxsize=max_chunks)
+    writer = _QueueWriter(q)
+    done = object()
+
+    def produce():
+        end = done
+        try:
+            write_report_excel_streaming(writer, df_all, df_filtered)
+        except BrokenPipeError:
+            pass
+        except Exception as e:
+            # 쓰기 실패는 받는 쪽에서 다시 던져 잘린 파일이 정상 응답으로 끝나지 않게 한다
+            end = e
+        finally:
+            q.put(end)
 
-    presets = load_presets()
-    msg = None
-    downloadable = False
-    keywords = ""
-    min_total = 0
-    max_comp_str = ""
-    selected = ""
-    sort_by = "total"
-    blog_content = ""
-    dup_results = None
+    threading.Thread(target=produce, daemon=True).start()
+    try:
+        while True:
+            chunk = q.get()
+            if chunk is done:
+                return
+            if isinstance(chunk, Exception):
+                raise chunk
+            yield chunk
+    finally:
+        # 클라이언트가 중간에 끊으면 쓰기 스레드를 멈추고 큐를 비워 준다
+        writer.closed = True
+        while True:
+            try:
+                q.get_nowait()
+            except queue.Empty:
+                break
+
+
+class ReportExport:
+    """
+    리포트 결과 DataFrame을 보관하다가 처음 다운로드할 때 엑셀을 만들고,
+    만든 bytes는 캐시해서 이후 다운로드에 재사용한다.
+    cache_path가 있으면 메모리 대신 그 파일에 캐시한다 (다른 워커 프로세스와 공유).
+    EXCEL_STREAMING_MIN_ROWS 행 이상이면 캐시하지 않고 매번 스트리밍으로 만든다.
+    """
+
+    def __init__(self, df_all, df_filtered, filename, cache_path=None):
+        self.df_all = df_all
+        self.df_filtered = df_filtered
+        self.filename = filename
+        self.cache_path = cache_path
+        self._bytes = None
+        self._lock = threading.Lock()
+
+    @property
+    def streaming(self):
+        return len(self.df_all) + len(self.df_filtered) >= EXCEL_STREAMING_MIN_ROWS
+
+    def excel_bytes(self):
+        with self._lock:
+            if self._bytes is not None:
+                return self._bytes
+            if self.cache_path and os.path.exists(self.cache_path):
+                with open(self.cache_path, "rb") as f:
+                    return f.read()
+
+            data = build_report_excel(self.df_all, self.df_filtered)
+            if self.cache_path:
+                write_file_atomic(self.cache_path, data)
+            else:
+                self._bytes = data
+            return data
+
+    def memory_size(self):
+        return int(
+            self.df_all.memory_usage(deep=True).sum()
+            + self.df_filtered.memory_usage(deep=True).sum()
+        )
+
+
+def write_file_atomic(path, data):
+    """임시 파일에 쓴 뒤 교체 (읽는 쪽이 반쯤 쓰인 파일을 보지 않도록)"""
+    tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+class ReportStore:
+    """
+    사용자별 리포트 보관소.
+    - 디스크: {root}/{user_id}/{report_id}/ 에 meta.json, frames.pkl(결과 DataFrame), report.xlsx
+      → 재시작 후에도 남고, 여러 gunicorn 워커가 같은 리포트를 내려받을 수 있다.
+    - 메모리: 최근 사용한 ReportExport를 memory_max_bytes까지 LRU로 보관
+    - 사용자별 최근 keep_per_user개만 남기고, ttl(초)이 지난 리포트는 삭제
+      (리포트를 더 만들지 않는 사용자 것도 지워지도록 1시간에 한 번 전체 사용자를 훑는다)
+    """
+
+    REPORT_ID_RE = re.compile(r"\d{20}-[0-9a-f]{8}")
+    SWEEP_INTERVAL = 3600
+
+    def __init__(self, root, memory_max_bytes, keep_per_user, ttl):
+        self.root = root
+        self.memory_max_bytes = memory_max_bytes
+        self.keep_per_user = keep_per_user
+        self.ttl = ttl
+        self.memory = OrderedDict()  # { (user_id, report_id): (ReportExport, size) }
+        self.memory_bytes = 0
+        self.last_swept = 0.0
+        self.lock = threading.Lock()
+
+    def _dir(self, user_id, report_id=None):
+        path = os.path.join(self.root, quote(user_id, safe=""))
+        return os.path.join(path, report_id) if report_id else path
+
+    def _remember(self, key, export):
+        size = export.memory_size()
+        with self.lock:
+            old = self.memory.pop(key, None)
+            if old:
+                self.memory_bytes -= old[1]
+            self.memory[key] = (export, size)
+            self.memory_bytes += size
+            while self.memory_bytes > self.memory_max_bytes and len(self.memory) > 1:
+                _, (_, evicted) = self.memory.popitem(last=False)
+                self.memory_bytes -= evicted
+
+    def _forget(self, key):
+        with self.lock:
+            old = self.memory.pop(key, None)
+            if old:
+                self.memory_bytes -= old[1]
+
+    def put(self, user_id, df_all, df_filtered, filename):
+        """리포트를 저장하고 (report_id, ReportExport)를 반환"""
+        report_id = f"{datetime.now().strftime('%Y%m%d%H%M%S%f')}-{uuid.uuid4().hex[:8]}"
+        path = self._dir(user_id, report_id)
+        os.makedirs(path, exist_ok=True)
+        write_file_atomic(
+            os.path.join(path, "frames.pkl"),
+            pickle.dumps({"df_all": df_all, "df_filtered": df_filtered}),
+        )
+        # meta.json이 마지막에 생겨야 완성된 리포트로 취급
+        write_file_atomic(
+            os.path.join(path, "meta.json"),
+            json.dumps(
+                {"filename": filename, "created_at": time.time()}, ensure_ascii=False
+            ).encode("utf-8"),
+        )
+        export = ReportExport(
+            df_all, df_filtered, filename, cache_path=os.path.join(path, "report.xlsx")
+        )
+        self._remember((user_id, report_id), export)
+        self.prune(user_id)
+        if time.time() - self.last_swept > self.SWEEP_INTERVAL:
+            self.sweep()
+        return report_id, export
+
+    def list(self, user_id):
+        """사용자의 보관 중인 리포트 [{id, filename, created_at}] (최신순)"""
+        try:
+            report_ids = sorted(os.listdir(self._dir(user_id)), reverse=True)
+        except FileNotFoundError:
+            return []
+        reports = []
+        for report_id in report_ids:
+            try:
+                with open(os.path.join(self._dir(user_id, report_id), "meta.json"), encoding="utf-8") as f:
+                    meta = json.load(f)
+            except (OSError, ValueError):
+                continue
+            reports.append({"id": report_id, **meta})
+        return reports
+
+    def get(self, user_id, report_id=None):
+        """ReportExport 반환 (report_id가 없으면 최신 리포트, 없거나 만료면 None)"""
+        if report_id is None:
+            reports = self.list(user_id)
+            if not reports:
+                return None
+            report_id = reports[0]["id"]
+        elif not self.REPORT_ID_RE.fullmatch(report_id):
+            return None
+
+        key = (user_id, report_id)
+        with self.lock:
+            hit = self.memory.get(key)
+            if hit:
+                self.memory.move_to_end(key)
+        path = self._dir(user_id, report_id)
+        try:
+            with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            self._forget(key)
+            return None
+        if time.time() - meta["created_at"] > self.ttl:
+            return None
+        if hit:
+            return hit[0]
+
+        # meta.json을 읽은 뒤 다른 요청/워커의 prune()이 지웠을 수 있으므로 없는 리포트로 취급
+        try:
+            with open(os.path.join(path, "frames.pkl"), "rb") as f:
+                frames = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            self._forget(key)
+            return None
+        export = ReportExport(
+            frames["df_all"],
+            frames["df_filtered"],
+            meta["filename"],
+            cache_path=os.path.join(path, "report.xlsx"),
+        )
+        self._remember(key, export)
+        return export
+
+    def prune(self, user_id):
+        """최근 keep_per_user개를 넘거나 ttl이 지난 리포트 삭제"""
+        now = time.time()
+        for i, report in enumerate(self.list(user_id)):
+            if i >= self.keep_per_user or now - report["created_at"] > self.ttl:
+                self._forget((user_id, report["id"]))
+                shutil.rmtree(self._dir(user_id, report["id"]), ignore_errors=True)
+
+    def sweep(self):
+        """모든 사용자 폴더에 prune() 적용 (비어 버린 사용자 폴더는 삭제)"""
+        self.last_swept = time.time()
+        try:
+            names = os.listdir(self.root)
+        except FileNotFoundError:
+            return
+        for name in names:
+            user_id = unquote(name)
+            self.prune(user_id)
+            try:
+                os.rmdir(self._dir(user_id))  # 저장 중인 리포트가 있으면 비어 있지 않아 실패
+            except OSError:
+                pass
+
+    def delete_user(self, user_id):
+        """계정 삭제 시 그 사용자의 리포트를 모두 지운다"""
+        with self.lock:
+            for key in [key for key in self.memory if key[0] == user_id]:
+                self.memory_bytes -= self.memory.pop(key)[1]
+        shutil.rmtree(self._dir(user_id), ignore_errors=True)
+
+
+# ==========================
+# CSV / Parquet / JSON Lines 내보내기
+# ==========================
+# 리포트 열 → 업종 템플릿 excel_columns 의 키 (표시 이름은 템플릿에서 가져옴)
+REPORT_COLUMN_FIELDS = {
+    "키워드": "relKeyword",
+    "PC 검색수": "monthlyPcQcCnt",
+    "모바일 검색수": "monthlyMobileQcCnt",
+    "총 검색수": "total",
+    "경쟁도": "compIdx",
+    "평균 노출 광고수": "plAvgDepth",
+    "기준 키워드 출처": "baseKeyword",
+}
+EXPORT_FORMATS = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "jsonl": ("application/x-ndjson; charset=utf-8", "jsonl"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+EXPORT_CHUNK_ROWS = 5000
+
+
+def export_column_names(columns, excel_columns):
+    """리포트 열 이름 → 업종 템플릿 excel_columns 표시 이름 (없거나 겹치면 원래 이름 유지)"""
+    mapping = {}
+    used = set(columns)
+    for col in columns:
+        label = (excel_columns or {}).get(REPORT_COLUMN_FIELDS.get(col))
+        if label and label != col and label not in used:
+            mapping[col] = label
+            used.add(label)
+    return mapping
+
+
+def stream_csv(df):
+    """CSV를 EXPORT_CHUNK_ROWS 행씩 만들어 내보냄 (엑셀에서 한글이 깨지지 않도록 BOM 포함)"""
+    yield "\ufeff"
+    for start in range(0, max(len(df), 1), EXPORT_CHUNK_ROWS):
+        yield df.iloc[start:start + EXPORT_CHUNK_ROWS].to_csv(index=False, header=start == 0)
+
+
+def stream_jsonl(df):
+    for start in range(0, len(df), EXPORT_CHUNK_ROWS):
+        chunk = df.iloc[start:start + EXPORT_CHUNK_ROWS]
+        # lines=True 결과는 줄바꿈으로 끝나므로 그대로 이어 붙인다
+        yield chunk.to_json(orient="records", lines=True, force_ascii=False)
 
-    # 그래프용 기본값
-    chart_available = False
-    chart_labels, chart_pc, chart_mo, chart_comp = [], [], [], []
-    chart_count = 0
 
-    # 기준 키워드별 요약 테이블 + 추천 키워드 조합 + 블로그 제목 그룹
+def export_frame(export, fmt, sheet, excel_columns):
+    """내보낼 시트의 DataFrame(업종 템플릿 열 이름 적용)과 파일 이름"""
+    df = export.df_filtered if sheet == "filtered" else export.df_all
+    df = df.rename(columns=export_column_names(df.columns, excel_columns))
+    filename = f"{os.path.splitext(export.filename)[0]}_{sheet}.{EXPORT_FORMATS[fmt][1]}"
+    return df, filename
+
+
+def send_report_export(export, fmt, sheet, excel_columns):
+    """
+    리포트를 CSV(스트리밍) / JSON Lines(스트리밍) / Parquet(zstd 압축)으로 내려준다.
+    sheet: "all"(전체 키워드) 또는 "filtered"(필터 적용)
+    """
+    df, filename = export_frame(export, fmt, sheet, excel_columns)
+    mimetype = EXPORT_FORMATS[fmt][0]
+
+    if fmt == "parquet":
+        try:
+            out = BytesIO()
+            df.to_parquet(out, index=False, compression="zstd")
+        except ImportError:
+            return "Parquet 내보내기에는 pyarrow 패키지가 필요합니다.", 501
+        out.seek(0)
+        return send_file(out, mimetype=mimetype, as_attachment=True, download_name=filename)
+
+    body = stream_csv(df) if fmt == "csv" else stream_jsonl(df)
+    return Response(
+        body,
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment; filename*=UTF-8''{quote(filename)}"},
+    )
+
+
+REPORT_STORE = ReportStore(
+    REPORT_STORE_DIR, REPORT_MEMORY_MAX_BYTES, REPORT_KEEP_PER_USER, REPORT_TTL
+)
+
+
+XLSX_MIMETYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+def send_report_excel(export):
+    if export.streaming:
+        return Response(
+            stream_report_excel(export.df_all, export.df_filtered),
+            mimetype=XLSX_MIMETYPE,
+            headers={
+                "Content-Disposition": (
+                    f"attachment; filename*=UTF-8''{quote(export.filename)}"
+                )
+            },
+        )
+    return send_file(
+        BytesIO(export.excel_bytes()),
+        mimetype=XLSX_MIMETYPE,
+        as_attachment=True,
+        download_name=export.filename,
+    )
+
+
+# ==========================
+# 리포트 생성 파이프라인
+# ==========================
+BLOG_TITLE_PATTERNS = [
+    # 정보성/가이드
+    "[{지역}] {키워드_을를} 찾고 계신가요? 솔직 가이드",
+    "현직자가 알려주는 {키워드} 실패하지 않는 법",
+    "{키워드} 비용/가격 꼼꼼하게 비교해 봤습니다",
+    "{지역} {키워드} 방문 전 꼭 알아야 할 3가지",
+
+    # 후기성/추천
+    "내돈내산 {지역} {키워드} 솔직 후기 (비추천 유형 포함)",
+    "나만 알고 싶은 {지역} {키워드} BEST 5 정리",
+    "직접 다녀온 {지역} {키워드}, 재방문 의사 200%",
+
+    # 어그로/궁금증
+    "{키워드_은는} 무조건 여기서 하세요 (광고 아님)",
+    "아직도 {키워드_을를} 고민하시나요? 딱 정해드립니다",
+    "{지역} 거주민이 추천하는 찐 {키워드} 리스트"
+]
+
+
+def merge_duplicate_keywords(df_all):
+    """
+    여러 기준 키워드에서 중복으로 수집된 키워드를 처음 나온 행 하나로 합친다.
+    '기준 키워드 목록'(처음 나온 순서의 출처들)과 '최초 수집 순서' 열을 덧붙이며,
+    '기준 키워드 출처'는 처음 수집된 기준 키워드로 유지한다.
+    """
+    src = "기준 키워드 출처"
+    pairs = df_all[["키워드", src]].drop_duplicates()
+    sources = (
+        pairs.assign(**{src: pairs[src].astype(str)})
+        .groupby("키워드", sort=False)[src]
+        .agg(", ".join)
+    )
+    first_seen = ~df_all["키워드"].duplicated(keep="first")
+    merged = df_all[first_seen]
+    return merged.assign(
+        **{
+            "기준 키워드 목록": merged["키워드"].map(sources),
+            "최초 수집 순서": np.flatnonzero(first_seen.to_numpy()) + 1,
+        }
+    ).reset_index(drop=True)
+
+
+def top_unique_rows(df, n, value_col):
+    """
+    value_col 상위 n개 행 (같은 키워드는 처음 한 행만).
+    전체 중복 제거 대신 상위 후보를 두 배씩 늘려 가며 서로 다른 키워드가 n개 모일 때까지 고른다.
+    """
+    m = n
+    while True:
+        top = df.nlargest(m, value_col)
+        unique = top.drop_duplicates("키워드")
+        if len(unique) >= n or m >= len(df):
+            return unique.head(n)
+        m *= 2
+
+
+def top_k_per_group(df, group_col, value_col, k):
+    """
+    그룹별 value_col 상위 k개 행 (전체 정렬 없이 그룹마다 argpartition으로 부분 선택).
+    결과는 그룹이 처음 나온 순서, 그룹 안에서는 값 내림차순(동점은 원래 순서)으로 정렬된다.
+    """
+    if df.empty:
+        return df
+    codes, _ = pd.factorize(df[group_col], sort=False)
+    values = df[value_col].to_numpy()
+    order = np.argsort(codes, kind="stable")
+    bounds = np.flatnonzero(np.diff(codes[order])) + 1
+
+    picked = []
+    for grp in np.split(order, bounds):  # grp: 그룹 내 행 위치 (원래 순서)
+        if len(grp) > k:
+            vals = values[grp]
+            kth = np.partition(vals, len(vals) - k)[len(vals) - k]
+            above = grp[vals > kth]
+            grp = np.concatenate([above, grp[vals == kth][:k - len(above)]])
+        picked.append(grp[np.lexsort((grp, -values[grp]))])
+    return df.iloc[np.concatenate(picked)]
+
+
+def summarize_by_base(df_all, df_filtered, pass_mask, base_keywords):
+    """
+    기준 키워드별 요약표(수집 수, 평균 검색량, 평균 경쟁도, 조건 통과 수)와
+    추천 키워드 조합(조건 통과 키워드 중 검색수 상위 3개)을 groupby 한 번씩으로 계산한다.
+    결과는 입력한 기준 키워드 순서를 따른다.
+    """
+    src = "기준 키워드 출처"
+    stats = (
+        df_all.assign(_pass=pass_mask)
+        .groupby(src, sort=False, observed=True)
+        .agg(
+            count=("키워드", "size"),
+            avg_total=("총 검색수", "mean"),
+            avg_comp=("경쟁도", "mean"),
+            passed=("_pass", "sum"),
+        )
+    )
+    top3 = (
+        top_k_per_group(df_filtered, src, "총 검색수", 3)
+        .groupby(src, sort=False, observed=True)["키워드"]
+        .agg(list)
+    )
+
     summary_table = []
     recommended_groups = []
-    blog_title_groups = []
-
-    # 로그인한 계정의 지역명/업종
-    user_info = ACCOUNTS.get(session["user"], {})
-    region = user_info.get("region", "") or ""
-    region = region.strip()
-    industry_code = user_info.get("industry", "driving")
-
-    # 업종 템플릿 로드
-    tpl = load_industry_template(industry_code)
-    report_title = tpl.get("report_title", "J&T Solution 키워드 리포트")
-    industry_name = tpl.get("industry", "키워드 리포트")
+    for base in dict.fromkeys(base_keywords):
+        if base in stats.index:
+            row = stats.loc[base]
+            summary_table.append(
+                {
+                    "기준 키워드": base,
+                    "수집 키워드 수": int(row["count"]),
+                    "평균 검색량": int(row["avg_total"]),
+                    "평균 경쟁도": round(row["avg_comp"], 2),
+                    "조건 통과": int(row["passed"]),
+                }
+            )
+        if base in top3.index:
+            phrases = [
+                kw if not base or base in kw else f"{base} {kw}"
+                for kw in top3.loc[base]
+            ]
+            recommended_groups.append({"base": base, "phrases": phrases})
+    return summary_table, recommended_groups
+
+
+def add_trend_columns(df_all, prev):
+    """
+    이전 스냅샷(키워드 인덱스)과 키워드로 맞춰 증감 열을 붙인다.
+    이전에 없던 키워드는 빈 값, 이전 검색수가 0이면 증감률만 빈 값.
+    """
+    prev_total = df_all["키워드"].map(prev["총 검색수"]).astype("Int64")
+    delta = df_all["총 검색수"].astype("Int64") - prev_total
+    rate = (delta.astype("float64") / prev_total.astype("float64")).where(prev_total > 0)
+    return df_all.assign(
+        **{
+            "이전 총 검색수": prev_total,
+            "검색수 증감": delta,
+            "증감률(%)": (rate * 100).round(1),
+        }
+    )
+
+
+def trend_rows(df):
+    """증감 상위/하위 키워드 표용 행 목록"""
+    return [
+        {
+            "키워드": kw,
+            "이전": int(prev),
+            "현재": int(cur),
+            "증감": int(d),
+            "증감률": None if pd.isna(r) else float(r),
+        }
+        for kw, prev, cur, d, r in zip(
+            df["키워드"], df["이전 총 검색수"], df["총 검색수"],
+            df["검색수 증감"], df["증감률(%)"],
+        )
+    ]
+
+
+def build_report(user_id, base_keywords, min_total=0, max_comp_val=None,
+                 sort_by="total", use_cache=True, on_base=None, dedupe=False,
+                 chart_top_n=CHART_TOP_N, preset="", store=True):
+    """
+    기준 키워드 수집 → 필터/정렬 → 요약표/그래프/추천 조합/블로그 제목 → 엑셀까지
+    리포트 한 건을 만들어 MAIN_HTML 렌더링에 쓰는 값(dict)으로 반환한다.
+    on_base(base, items, error)는 기준 키워드 하나의 수집이 끝날 때마다 호출된다.
+    dedupe=True 면 기준 키워드 간 중복 키워드를 한 행으로 합친 뒤 이후 단계를 진행한다.
+    같은 사용자/프리셋(preset이 없으면 같은 기준 키워드 목록)의 이전 스냅샷이 있으면
+    증감 열을 붙이고, 이번 결과를 데이터 조회일 스냅샷으로 저장한다
+    (조회에 실패한 기준 키워드가 있으면 저장하지 않음).
+    store=False 면 리포트 보관소에 넣지 않고 ReportExport만 만든다 (CLI 배치 생성용).
+    """
+    report = {
+        "msg": None,
+        "downloadable": False,
+        "chart_available": False,
+        "chart_labels": [],
+        "chart_pc": [],
+        "chart_mo": [],
+        "chart_comp": [],
+        "chart_prev": [],
+        "chart_count": 0,
+        "summary_table": [],
+        "recommended_groups": [],
+        "blog_title_groups": [],
+        "trend_date": None,
+        "trend_counts": None,
+        "trend_up": [],
+        "trend_down": [],
+        "excel": None,
+        "report_id": None,
+    }
+    blog_title_groups = report["blog_title_groups"]
+
+    # 계정의 지역명/업종 → 업종 템플릿
+    user_info = STORE.get_account(user_id) or {}
+    region = (user_info.get("region", "") or "").strip()
+    tpl = load_industry_template(user_info.get("industry", "driving"))
     good_keyword_rule = tpl.get(
         "good_keyword_rule", "검색량 100 이상 & 경쟁도 0.8 이하 = 좋은 키워드"
     )
@@ -921,23 +2751,602 @@ def index():
         "총 {total_keywords}개 키워드 중 {passed_keywords}개가 조건을 통과했습니다. "
         "평균 검색량 {avg_search}회, 평균 경쟁도 {avg_comp}입니다.",
     )
-    title_patterns = [
-        # 정보성/가이드
-        "[{지역}] {키워드_을를} 찾고 계신가요? 솔직 가이드",
-        "현직자가 알려주는 {키워드} 실패하지 않는 법",
-        "{키워드} 비용/가격 꼼꼼하게 비교해 봤습니다",
-        "{지역} {키워드} 방문 전 꼭 알아야 할 3가지",
-
-        # 후기성/추천
-        "내돈내산 {지역} {키워드} 솔직 후기 (비추천 유형 포함)",
-        "나만 알고 싶은 {지역} {키워드} BEST 5 정리",
-        "직접 다녀온 {지역} {키워드}, 재방문 의사 200%",
-
-        # 어그로/궁금증
-        "{키워드_은는} 무조건 여기서 하세요 (광고 아님)",
-        "아직도 {키워드_을를} 고민하시나요? 딱 정해드립니다",
-        "{지역} 거주민이 추천하는 찐 {키워드} 리스트"
-    ]
+
+    # 기준 키워드별 수집 (병렬, 초당 호출 수 제한)
+    cache_before = KEYWORD_CACHE.stats()
+    history_before = KEYWORD_HISTORY.stats()
+    started = time.time()
+    rows, failed_bases = collect_keyword_rows(
+        base_keywords, use_cache=use_cache, on_base=on_base
+    )
+    cache_after = KEYWORD_CACHE.stats()
+    history_hits = KEYWORD_HISTORY.stats()["hits"] - history_before["hits"]
+    cache_msg = (
+        f"<br><small>캐시 적중 {cache_after['hits'] - cache_before['hits']}건 / "
+        f"미스 {cache_after['misses'] - cache_before['misses']}건 "
+        f"(누적 적중 {cache_after['hits']} / 미스 {cache_after['misses']})"
+        f" · 저장된 이력 재사용 {history_hits}건"
+    )
+    # 캐시/이력에서 가져온 데이터가 있으면 언제 조회한 데이터인지 함께 표시
+    fetched = rows.fetched_at.values()
+    if fetched and min(fetched) < started:
+        oldest = datetime.fromtimestamp(min(fetched)).strftime("%Y-%m-%d %H:%M")
+        newest = datetime.fromtimestamp(max(fetched)).strftime("%Y-%m-%d %H:%M")
+        cache_msg += f" · 데이터 조회 시각 {oldest}"
+        if newest != oldest:
+            cache_msg += f" ~ {newest}"
+    cache_msg += "</small>"
+    if failed_bases:
+        # msg는 HTML 그대로 렌더링되므로 사용자가 입력한 키워드는 escape
+        cache_msg += "<br>⚠️ 조회에 실패한 기준 키워드: " + ", ".join(
+            html.escape(base) for base in failed_bases
+        )
+
+    if not len(rows):
+        report["msg"] = "수집된 키워드가 없습니다." + cache_msg
+        return report
+
+    df_all = rows.to_frame()
+    if dedupe:
+        df_all = merge_duplicate_keywords(df_all)
+
+    # 이전 스냅샷 대비 증감 (키워드 인덱스로 맞춤) → 이번 결과를 데이터 조회일 스냅샷으로 저장
+    # 일부 기준 키워드가 빠진 결과는 다음 비교 기준으로 쓰지 않도록 저장하지 않는다
+    key = snapshot_key(preset, base_keywords)
+    fetched_at = max(rows.fetched_at.values(), default=time.time())
+    trend_date, prev = REPORT_SNAPSHOTS.previous(user_id, key, fetched_at)
+    if not failed_bases:
+        REPORT_SNAPSHOTS.save(user_id, key, df_all, fetched_at)
+    if prev is not None:
+        df_all = add_trend_columns(df_all, prev)
+        changed = df_all.dropna(subset=["검색수 증감"]).drop_duplicates("키워드")
+        report["trend_date"] = trend_date
+        report["trend_counts"] = {
+            "up": int((changed["검색수 증감"] > 0).sum()),
+            "down": int((changed["검색수 증감"] < 0).sum()),
+            "new": int(df_all.drop_duplicates("키워드")["이전 총 검색수"].isna().sum()),
+        }
+        report["trend_up"] = trend_rows(
+            changed[changed["검색수 증감"] > 0].nlargest(10, "검색수 증감")
+        )
+        report["trend_down"] = trend_rows(
+            changed[changed["검색수 증감"] < 0].nsmallest(10, "검색수 증감")
+        )
+
+    # 필터 적용 (조건 통과 여부는 요약표에서도 재사용)
+    pass_mask = df_all["총 검색수"] >= min_total
+    if max_comp_val is not None:
+        comp = df_all["경쟁도"].astype("float64")
+        pass_mask &= comp.notna() & (comp <= max_comp_val)
+    df_filtered = df_all[pass_mask]
+
+    # 정렬 적용 (필터된 데이터에 대해서)
+    if not df_filtered.empty:
+        if sort_by == "comp":
+            df_filtered = df_filtered.sort_values("경쟁도", ascending=True)
+        else:
+            df_filtered = df_filtered.sort_values("총 검색수", ascending=False)
+
+    # 기준 키워드별 요약 테이블 + 추천 키워드 조합 (groupby 한 번으로 계산)
+    summary_table, recommended_groups = summarize_by_base(
+        df_all, df_filtered, pass_mask, base_keywords
+    )
+    report["summary_table"] = summary_table
+    report["recommended_groups"] = recommended_groups
+
+    # 그래프용 데이터 (전체 기준 검색수 상위 chart_top_n개 키워드, 전체 정렬 없이 선택)
+    top_df = top_unique_rows(df_all, chart_top_n, "총 검색수")
+    report["chart_labels"] = top_df["키워드"].tolist()
+    report["chart_pc"] = top_df["PC 검색수"].tolist()
+    report["chart_mo"] = top_df["모바일 검색수"].tolist()
+    report["chart_comp"] = top_df["경쟁도"].fillna(0).tolist()
+    if report["trend_date"]:
+        report["chart_prev"] = [
+            None if pd.isna(v) else int(v) for v in top_df["이전 총 검색수"]
+        ]
+    report["chart_count"] = len(top_df)
+    report["chart_available"] = report["chart_count"] > 0
+
+    # ==========================
+    # 요약문 + 예상 광고비 / 유입 규모 (러프 추정)
+    # ==========================
+    if not df_filtered.empty:
+        avg_total_all = int(df_filtered["총 검색수"].mean())
+        avg_comp_all = round(df_filtered["경쟁도"].mean(), 2)
+
+        # 템플릿 기반 요약문
+        summary_core = summary_format.format(
+            total_keywords=len(df_all),
+            passed_keywords=len(df_filtered),
+            avg_search=avg_total_all,
+            avg_comp=avg_comp_all,
+        )
+        summary_msg = f"리포트 생성 완료. {summary_core} ({good_keyword_rule})<br>"
+
+        # 🔹 여기서부터는 '추측입니다' 영역 (러프 추정)
+        total_search_sum = int(df_filtered["총 검색수"].sum())
+
+        # 예시 가정 (추측입니다):
+        # - 예상 클릭율: 1% ~ 3%
+        # - 클릭당 비용: 500원 ~ 1,500원
+        est_clicks_low = int(total_search_sum * 0.01)
+        est_clicks_high = int(total_search_sum * 0.03)
+
+        cpc_low = 500
+        cpc_high = 1500
+
+        est_budget_low = est_clicks_low * cpc_low
+        est_budget_high = est_clicks_high * cpc_high
+
+        estimate_msg = (
+            "<br>※ 아래 수치는 네이버 검색량을 기준의 예상 광고비용이며, "
+            "실제 광고 집행 결과와는 다를 수 있습니다.<br>"
+            f"- 월 예상 클릭수: 약 {est_clicks_low:,} ~ {est_clicks_high:,}회<br>"
+            f"- 월 예상 광고비: 약 {est_budget_low:,.0f}원 ~ "
+            f"{est_budget_high:,.0f}원 수준"
+        )
+
+        full_msg = summary_msg + estimate_msg
+    else:
+        full_msg = "조건에 맞는 키워드가 없습니다."
+
+    # 🔹 블로그 제목 자동 제안 (업종 템플릿 + 지역 포함)
+    region_placeholder = region if region else ""
+    for group in recommended_groups:
+        base = group["base"]
+        phrases = group["phrases"]
+        if not phrases:
+            continue
+        main_kw = phrases[0]  # 가장 조회수 높은 키워드 사용
+
+        titles = []
+        # 랜덤으로 5개만 뽑아서 제안 (매번 다르게)
+        selected_patterns = random.sample(
+            BLOG_TITLE_PATTERNS, min(5, len(BLOG_TITLE_PATTERNS))
+        )
+
+        for pat in selected_patterns:
+            # 1. 키워드+조사 처리
+            # 예: {키워드_을를} -> 사과를 / 수박을
+            processed_kw_ul = josa(main_kw, '을를')
+            processed_kw_un = josa(main_kw, '은는')
+            processed_kw_iga = josa(main_kw, '이가')
+
+            # 2. 치환 (지역, 키워드, 조사포함키워드)
+            t = pat.replace("{지역}", region_placeholder)
+            t = t.replace("{키워드}", main_kw)
+            t = t.replace("{키워드_을를}", processed_kw_ul)
+            t = t.replace("{키워드_은는}", processed_kw_un)
+            t = t.replace("{키워드_이가}", processed_kw_iga)
+
+            # 3. 공백 정리
+            t = " ".join(t.split())
+            titles.append(t)
+
+        blog_title_groups.append({
+            "base": base,
+            "titles": titles,
+        })
+
+    # 엑셀은 다운로드 요청 시 만들도록 결과 DataFrame만 보관
+    ts = datetime.now().strftime("%Y-%m-%d_%H%M")
+    fname = f"JNT_Keyword_Report_{user_id}_{ts}.xlsx"
+    if store:
+        report["report_id"], report["excel"] = REPORT_STORE.put(
+            user_id, df_all, df_filtered, fname
+        )
+    else:
+        report["excel"] = ReportExport(df_all, df_filtered, fname)
+    report["downloadable"] = True
+    report["msg"] = full_msg + cache_msg
+    return report
+
+
+# ==========================
+# 리포트 생성 작업 큐 (백그라운드 실행)
+# ==========================
+def _json_default(value):
+    """numpy 스칼라 등 json이 모르는 값 → 파이썬 기본 값"""
+    if hasattr(value, "item"):
+        return value.item()
+    raise TypeError(f"JSON으로 저장할 수 없는 값: {type(value).__name__}")
+
+
+class JobStore:
+    """
+    작업 상태/진행 수/진행 이벤트/결과를 SQLite에 남겨 둔다.
+    작업을 실행하는 프로세스는 메모리의 ReportJob으로 바로 알리고,
+    다른 워커 프로세스(또는 재시작 후)는 이 저장소에서 읽고 이벤트를 폴링한다.
+    ttl(초)이 지난 완료 작업은 새 작업을 넣을 때 정리한다.
+    """
+
+    def __init__(self, path, ttl):
+        self.path = path
+        self.ttl = ttl
+        with closing(sqlite_connect(self.path)) as conn, conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id TEXT PRIMARY KEY, user_id TEXT NOT NULL, kind TEXT NOT NULL, "
+                "status TEXT NOT NULL, done INTEGER NOT NULL, total INTEGER NOT NULL, "
+                "error TEXT, params TEXT NOT NULL, result TEXT, created_at REAL NOT NULL, "
+                "updated_at REAL NOT NULL, finished_at REAL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS job_events ("
+                "job_id TEXT NOT NULL, seq INTEGER NOT NULL, data TEXT NOT NULL, "
+                "PRIMARY KEY (job_id, seq)) WITHOUT ROWID"
+            )
+
+    def create(self, job):
+        now = time.time()
+        with closing(sqlite_connect(self.path)) as conn, conn:
+            old_ids = conn.execute(
+                "SELECT id FROM jobs WHERE finished_at < ?", (now - self.ttl,)
+            ).fetchall()
+            conn.executemany("DELETE FROM job_events WHERE job_id = ?", old_ids)
+            conn.executemany("DELETE FROM jobs WHERE id = ?", old_ids)
+            conn.execute(
+                "INSERT INTO jobs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    job.id, job.user_id, job.kind, job.status, job.done, job.total,
+                    job.error, json.dumps(job.params, ensure_ascii=False, default=_json_default),
+                    None, job.created_at, now, None,
+                ),
+            )
+
+    def update(self, job, event=None, seq=None):
+        """상태/진행 수/결과를 저장하고, event가 있으면 seq번째 이벤트로 함께 저장 (한 트랜잭션)"""
+        result = (
+            None if job.result is None
+            else json.dumps(job.result, ensure_ascii=False, default=_json_default)
+        )
+        with closing(sqlite_connect(self.path)) as conn, conn:
+            if event is not None:
+                conn.execute(
+                    "INSERT OR REPLACE INTO job_events VALUES (?, ?, ?)",
+                    (job.id, seq, json.dumps(event, ensure_ascii=False, default=_json_default)),
+                )
+            conn.execute(
+                "UPDATE jobs SET status = ?, done = ?, error = ?, result = ?, "
+                "updated_at = ?, finished_at = ? WHERE id = ?",
+                (job.status, job.done, job.error, result, time.time(), job.finished_at, job.id),
+            )
+
+    def load(self, job_id):
+        """저장된 작업 1건 → dict (없으면 None)"""
+        with closing(sqlite_connect(self.path)) as conn:
+            row = conn.execute(
+                "SELECT id, user_id, kind, status, done, total, error, params, result, "
+                "created_at, updated_at, finished_at FROM jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        keys = ("id", "user_id", "kind", "status", "done", "total", "error", "params",
+                "result", "created_at", "updated_at", "finished_at")
+        data = dict(zip(keys, row))
+        data["params"] = json.loads(data["params"])
+        data["result"] = None if data["result"] is None else json.loads(data["result"])
+        return data
+
+    def events(self, job_id, start):
+        with closing(sqlite_connect(self.path)) as conn:
+            rows = conn.execute(
+                "SELECT data FROM job_events WHERE job_id = ? AND seq >= ? ORDER BY seq",
+                (job_id, start),
+            ).fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+
+JOB_STORE = JobStore(JOBS_DB_FILE, REPORT_JOB_TTL)
+
+
+class ReportJob:
+    """
+    백그라운드 작업 1건의 상태 (queued → running → done / error)
+    kind: "report"(리포트 생성, 기준 키워드 단위 진행) / "dup"(원고 중복 검사, 문장 단위 진행)
+    상태가 바뀔 때마다 JOB_STORE에도 저장한다. load()로 읽어 온 작업(local=False)은
+    다른 프로세스가 실행 중이므로 wait_events()가 저장소를 폴링한다.
+    """
+
+    POLL_INTERVAL = 0.5
+
+    def __init__(self, user_id, params, kind="report"):
+        self.id = uuid.uuid4().hex
+        self.user_id = user_id
+        self.params = params
+        self.kind = kind
+        self.status = "queued"
+        if kind == "dup":
+            self.total = len(params["sentences"])
+        else:
+            self.total = len(dict.fromkeys(params["base_keywords"]))
+        self.done = 0
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self.local = True
+        self.events = []  # SSE로 내보낼 진행 이벤트 (순서대로 누적)
+        self.lock = threading.RLock()
+        self.changed = threading.Condition(self.lock)
+
+    @classmethod
+    def load(cls, job_id):
+        """JOB_STORE에서 작업을 읽어 온다 (없으면 None, 오래 소식이 없는 미완료 작업은 오류로 표시)"""
+        data = JOB_STORE.load(job_id)
+        if data is None:
+            return None
+        job = cls.__new__(cls)
+        job.__dict__.update(
+            {k: v for k, v in data.items() if k != "updated_at"},
+            local=False,
+            events=[],
+            lock=threading.RLock(),
+        )
+        job.changed = threading.Condition(job.lock)
+        if job.finished_at is None and time.time() - data["updated_at"] > REPORT_JOB_STALE_AFTER:
+            # 실행하던 프로세스가 사라진 작업 → 오류로 마무리해 저장 (다른 화면도 같은 결과를 보게)
+            job.status = "error"
+            job.error = "작업이 중단되었습니다 (서버 재시작 등). 다시 실행해 주세요."
+            job.finished_at = time.time()
+            event = {"type": "error", "error": job.error}
+            JOB_STORE.update(job, event, len(JOB_STORE.events(job.id, 0)))
+        return job
+
+    def start(self):
+        with self.changed:
+            self.status = "running"
+            JOB_STORE.update(self)
+
+    def push_event(self, event):
+        with self.changed:
+            self.events.append(event)
+            JOB_STORE.update(self, event, len(self.events) - 1)
+            self.changed.notify_all()
+
+    def on_base(self, base, items, error=None):
+        """기준 키워드 1개 수집 완료 → 진행 수 증가 + 부분 결과 이벤트"""
+        rows = [
+            (item["relKeyword"],
+             to_int(item.get("monthlyPcQcCnt")) + to_int(item.get("monthlyMobileQcCnt")))
+            for item in items or []
+            if item.get("relKeyword")
+        ]
+        top = heapq.nlargest(3, rows, key=lambda r: r[1])
+        with self.changed:
+            self.done += 1
+            self.push_event({
+                "type": "base",
+                "base": base,
+                "count": len(rows),
+                "top": [{"keyword": kw, "total": total} for kw, total in top],
+                "error": error,
+                "done": self.done,
+                "total": self.total,
+            })
+
+    def on_sentence(self, result):
+        """문장 1개 검사 완료 → 진행 수 증가 + 판정 이벤트"""
+        with self.changed:
+            self.done += 1
+            self.push_event({
+                "type": "sentence",
+                "sentence": result["sentence"],
+                "status": result["status"],
+                "is_safe": result["is_safe"],
+                "done": self.done,
+                "total": self.total,
+            })
+
+    def finish(self):
+        """
+        마지막 done/error 이벤트를 넣은 뒤 완료 시각을 기록한다.
+        한 잠금 안에서 처리해 스트림이 완료만 보고 마지막 이벤트 전에 끝나지 않게 한다.
+        """
+        with self.changed:
+            event = {"type": self.status, "error": self.error}
+            self.events.append(event)
+            self.finished_at = time.time()
+            JOB_STORE.update(self, event, len(self.events) - 1)
+            self.changed.notify_all()
+
+    def wait_events(self, start, timeout):
+        """start번째 이후 이벤트를 반환 (없으면 timeout초까지 대기)"""
+        if not self.local:
+            return self._poll_events(start, timeout)
+        with self.changed:
+            if len(self.events) <= start and self.finished_at is None:
+                self.changed.wait(timeout)
+            return self.events[start:], self.finished_at is not None
+
+    def _poll_events(self, start, timeout):
+        """다른 프로세스가 실행하는 작업: 저장소에 이벤트가 생기거나 끝날 때까지 폴링"""
+        deadline = time.time() + timeout
+        while True:
+            events = JOB_STORE.events(self.id, start)
+            if events or self.finished_at is not None or time.time() >= deadline:
+                return events, self.finished_at is not None
+            time.sleep(self.POLL_INTERVAL)
+            latest = ReportJob.load(self.id)
+            if latest is None:
+                return [], True
+            self.status, self.done, self.error, self.finished_at = (
+                latest.status, latest.done, latest.error, latest.finished_at
+            )
+
+    def to_status(self):
+        with self.lock:
+            return {
+                "id": self.id,
+                "kind": self.kind,
+                "status": self.status,
+                "done": self.done,
+                "total": self.total,
+                "error": self.error,
+            }
+
+
+JOBS = {}  # { job_id: ReportJob }
+JOBS_LOCK = threading.Lock()
+JOB_EXECUTOR = ThreadPoolExecutor(
+    max_workers=REPORT_JOB_WORKERS, thread_name_prefix="report-job"
+)
+# 중복 검사는 문장 수 × 검색 속도 제한만큼 오래 걸리므로 리포트 작업과 스레드 풀을 나눈다
+DUP_JOB_EXECUTOR = ThreadPoolExecutor(
+    max_workers=DUP_JOB_WORKERS, thread_name_prefix="dup-job"
+)
+
+
+def run_job(job, work):
+    """work(job)을 실행하고 결과/오류를 기록한 뒤 done/error 이벤트로 마무리"""
+    job.start()
+    try:
+        job.result = work(job)
+        job.status = "done"
+    except Exception as e:
+        job.error = str(e)
+        job.status = "error"
+    finally:
+        job.finish()
+
+
+def run_report_job(job):
+    p = job.params
+    report = build_report(
+        job.user_id,
+        p["base_keywords"],
+        min_total=p["min_total"],
+        max_comp_val=p["max_comp_val"],
+        sort_by=p["sort_by"],
+        use_cache=p["use_cache"],
+        on_base=job.on_base,
+        dedupe=p["dedupe"],
+        chart_top_n=p["chart_top"],
+        preset=p["preset"],
+    )
+    # 결과 DataFrame은 REPORT_STORE에 있으므로 작업에는 화면 표시용 값만 남긴다
+    return {k: v for k, v in report.items() if k != "excel"}
+
+
+def run_dup_job(job):
+    results = check_sentences(job.params["sentences"], on_result=job.on_sentence)
+    return {
+        "dup_results": results,
+        "dup_summary": summarize_duplication(results, job.params.get("eligible")),
+        "dup_cache_stats": dup_cache_stats(results),
+    }
+
+
+JOB_RUNNERS = {"report": run_report_job, "dup": run_dup_job}
+JOB_EXECUTORS = {"report": JOB_EXECUTOR, "dup": DUP_JOB_EXECUTOR}
+
+
+def submit_job(user_id, params, kind="report"):
+    """작업을 큐에 넣고 ReportJob을 반환 (오래된 완료 작업은 함께 정리)"""
+    job = ReportJob(user_id, params, kind)
+    now = time.time()
+    with JOBS_LOCK:
+        for jid in [
+            jid for jid, j in JOBS.items()
+            if j.finished_at and now - j.finished_at > REPORT_JOB_TTL
+        ]:
+            JOBS.pop(jid)
+        JOBS[job.id] = job
+    JOB_STORE.create(job)
+    JOB_EXECUTORS[kind].submit(run_job, job, JOB_RUNNERS[kind])
+    return job
+
+
+def get_user_job(job_id):
+    """
+    로그인한 사용자의 작업만 반환 (없거나 남의 작업이면 None).
+    이 프로세스에서 실행 중인 작업이 아니면 JOB_STORE에서 읽어 온다.
+    """
+    job = JOBS.get(job_id) or ReportJob.load(job_id)
+    if job is None or job.user_id != session.get("user"):
+        return None
+    return job
+
+
+def render_main(**context):
+    """MAIN_HTML 렌더링 (넘기지 않은 값은 기본값 사용)"""
+    user_info = STORE.get_account(session["user"]) or {}
+    tpl = load_industry_template(user_info.get("industry", "driving"))
+    values = {
+        "presets": {},
+        "shared_presets": STORE.shared_presets(),
+        "selected": "",
+        "keywords": "",
+        "min_total": 0,
+        "max_comp": "",
+        "msg": None,
+        "downloadable": False,
+        "download_url": None,
+        "report_id": None,
+        "sort_by": "total",
+        "no_cache": False,
+        "dedupe": False,
+        "chart_top": CHART_TOP_N,
+        "chart_top_max": CHART_TOP_MAX,
+        "chart_available": False,
+        "chart_labels": [],
+        "chart_pc": [],
+        "chart_mo": [],
+        "chart_comp": [],
+        "chart_prev": [],
+        "chart_count": 0,
+        "summary_table": [],
+        "recommended_groups": [],
+        "blog_title_groups": [],
+        "trend_date": None,
+        "trend_counts": None,
+        "trend_up": [],
+        "trend_down": [],
+        "report_title": tpl.get("report_title", "J&T Solution 키워드 리포트"),
+        "industry_name": tpl.get("industry", "키워드 리포트"),
+        "blog_content": "",
+        "dup_sample_size": DUP_CHECK_SAMPLE_SIZE,
+        "dup_max_sample": DUP_CHECK_MAX_SAMPLE,
+        "dup_full_scan_max": DUP_FULL_SCAN_MAX,
+        "dup_full_scan": False,
+        "dup_results": None,
+        "dup_summary": None,
+        "dup_cache_stats": None,
+        "job": None,
+    }
+    values.update(context)
+    return render_template(MAIN_TEMPLATE, **values)
+
+
+def form_int(name, default, lo, hi):
+    """폼 값을 정수로 읽어 lo~hi 범위로 제한 (비었거나 숫자가 아니면 default)"""
+    try:
+        value = int(request.form.get(name) or default)
+    except ValueError:
+        value = default
+    return max(lo, min(hi, value))
+
+
+@app.route("/", methods=["GET", "POST"])
+def index():
+    if "user" not in session:
+        return redirect("/login")
+
+    presets = load_presets()
+    shared_presets = STORE.shared_presets()
+    msg = None
+    keywords = ""
+    min_total = 0
+    max_comp_str = ""
+    selected = ""
+    sort_by = "total"
+    no_cache = False
+    dedupe = False
+    chart_top = CHART_TOP_N
+    blog_content = ""
+    dup_sample_size = DUP_CHECK_SAMPLE_SIZE
+    dup_full_scan = False
 
     if request.method == "POST":
         action = request.form.get("action")
@@ -947,11 +3356,15 @@ def index():
         max_comp_val = to_float(max_comp_str) if max_comp_str else None
         selected = request.form.get("preset", "")
         sort_by = request.form.get("sort_by", "total")
+        no_cache = request.form.get("no_cache") == "1"
+        dedupe = request.form.get("dedupe") == "1"
+        chart_top = form_int("chart_top", CHART_TOP_N, 1, CHART_TOP_MAX)
 
         if action == "load":
-            if selected and selected in presets:
-                keywords = presets[selected]
-                msg = f"프리셋 '{selected}'을(를) 불러왔습니다."
+            # 계정 프리셋에 없으면 공용 프리셋에서 찾는다
+            if selected and (selected in presets or selected in shared_presets):
+                keywords = presets.get(selected, shared_presets.get(selected))
+                msg = f"프리셋 '{html.escape(selected)}'을(를) 불러왔습니다."
             else:
                 msg = "불러올 프리셋을 선택해 주세요."
 
@@ -962,302 +3375,203 @@ def index():
             elif not keywords:
                 msg = "현재 키워드가 비어 있어 저장할 수 없습니다."
             else:
+                STORE.save_preset(session["user"], newname, keywords)
                 presets[newname] = keywords
-                save_presets(presets)
-                msg = f"프리셋 '{newname}'이(가) 저장되었습니다."
+                msg = f"프리셋 '{html.escape(newname)}'이(가) 저장되었습니다."
 
         elif action == "delete_preset":
             target = request.form.get("preset", "").strip()
             if not target:
                 msg = "삭제할 프리셋을 먼저 선택해 주세요."
             elif target not in presets:
-                msg = "해당 프리셋을 찾을 수 없습니다."
+                if target in shared_presets:
+                    msg = "공용 프리셋은 삭제할 수 없습니다."
+                else:
+                    msg = "해당 프리셋을 찾을 수 없습니다."
             else:
+                STORE.delete_preset(session["user"], target)
                 presets.pop(target)
-                save_presets(presets)
                 if selected == target:
                     selected = ""
                     keywords = ""
-                msg = f"프리셋 '{target}'이(가) 삭제되었습니다."
+                msg = f"프리셋 '{html.escape(target)}'이(가) 삭제되었습니다."
 
         elif action == "generate":
-            base_keywords = [k.strip() for k in keywords.split(",") if k.strip()]
+            base_keywords = split_keywords(keywords)
             if not base_keywords:
                 msg = "기준 키워드를 하나 이상 입력해 주세요."
             else:
-                all_rows = []
-
-                # 기준 키워드별 수집
-                for base in base_keywords:
-                    items = fetch_keyword_stats(base)
-                    for item in items:
-                        rel = item.get("relKeyword")
-                        if not rel:
-                            continue
-                        pc = to_int(item.get("monthlyPcQcCnt"))
-                        mo = to_int(item.get("monthlyMobileQcCnt"))
-                        total = pc + mo
-                        comp_text = item.get("compIdx")
-                        comp_score = parse_competition(comp_text)
-
-                        all_rows.append(
-                            {
-                                "키워드": rel,
-                                "PC 검색수": pc,
-                                "모바일 검색수": mo,
-                                "총 검색수": total,
-                                "평균 노출 광고수": item.get("plAvgDepth"),
-                                "경쟁도": comp_score,
-                                "경쟁도(텍스트)": comp_text,
-                                "기준 키워드 출처": base,
-                            }
-                        )
-                    time.sleep(0.3)
-
-                if not all_rows:
-                    msg = "수집된 키워드가 없습니다."
-                else:
-                    df_all = pd.DataFrame(all_rows)
-
-                    # 필터 적용
-                    df_filtered = df_all[df_all["총 검색수"] >= min_total]
-                    if max_comp_val is not None:
-                        df_filtered = df_filtered[
-                            (df_filtered["경쟁도"].notna())
-                            & (df_filtered["경쟁도"] <= max_comp_val)
-                        ]
-
-                    # 정렬 적용 (필터된 데이터에 대해서)
-                    if not df_filtered.empty:
-                        if sort_by == "comp":
-                            df_filtered = df_filtered.sort_values(
-                                "경쟁도", ascending=True
-                            )
-                        else:
-                            df_filtered = df_filtered.sort_values(
-                                "총 검색수", ascending=False
-                            )
-
-                    # 기준 키워드별 요약 테이블
-                    for base in base_keywords:
-                        sub = df_all[df_all["기준 키워드 출처"] == base]
-                        if sub.empty:
-                            continue
-                        avg_total = int(sub["총 검색수"].mean())
-                        avg_comp = round(sub["경쟁도"].mean(), 2)
-                        if max_comp_val is not None:
-                            sub_pass = sub[
-                                (sub["총 검색수"] >= min_total)
-                                & (sub["경쟁도"].notna())
-                                & (sub["경쟁도"] <= max_comp_val)
-                            ]
-                        else:
-                            sub_pass = sub[sub["총 검색수"] >= min_total]
-
-                        summary_table.append(
-                            {
-                                "기준 키워드": base,
-                                "수집 키워드 수": len(sub),
-                                "평균 검색량": avg_total,
-                                "평균 경쟁도": avg_comp,
-                                "조건 통과": len(sub_pass),
-                            }
-                        )
-
-                    # 그래프용 데이터 (전체 기준 상위 20개)
-                    top_df = df_all.sort_values("총 검색수", ascending=False).head(20)
-                    chart_labels = top_df["키워드"].tolist()
-                    chart_pc = top_df["PC 검색수"].tolist()
-                    chart_mo = top_df["모바일 검색수"].tolist()
-                    chart_comp = top_df["경쟁도"].fillna(0).tolist()
-                    chart_count = len(top_df)
-                    chart_available = chart_count > 0
-
-                    # ==========================
-                    # 요약문 + 예상 광고비 / 유입 규모 (러프 추정)
-                    # ==========================
-                    if not df_filtered.empty:
-                        avg_total_all = int(df_filtered["총 검색수"].mean())
-                        avg_comp_all = round(df_filtered["경쟁도"].mean(), 2)
-
-                        # 템플릿 기반 요약문
-                        summary_core = summary_format.format(
-                            total_keywords=len(df_all),
-                            passed_keywords=len(df_filtered),
-                            avg_search=avg_total_all,
-                            avg_comp=avg_comp_all,
-                        )
-                        summary_msg = (
-                            f"리포트 생성 완료. {summary_core} ({good_keyword_rule})<br>"
-                        )
-
-                        # 🔹 여기서부터는 '추측입니다' 영역 (러프 추정)
-                        total_search_sum = int(df_filtered["총 검색수"].sum())
-
-                        # 예시 가정 (추측입니다):
-                        # - 예상 클릭율: 1% ~ 3%
-                        # - 클릭당 비용: 500원 ~ 1,500원
-                        est_clicks_low = int(total_search_sum * 0.01)
-                        est_clicks_high = int(total_search_sum * 0.03)
-
-                        cpc_low = 500
-                        cpc_high = 1500
-
-                        est_budget_low = est_clicks_low * cpc_low
-                        est_budget_high = est_clicks_high * cpc_high
-
-                        estimate_msg = (
-                            "<br>※ 아래 수치는 네이버 검색량을 기준의 예상 광고비용이며, "
-                            "실제 광고 집행 결과와는 다를 수 있습니다.<br>"
-                            f"- 월 예상 클릭수: 약 {est_clicks_low:,} ~ {est_clicks_high:,}회<br>"
-                            f"- 월 예상 광고비: 약 {est_budget_low:,.0f}원 ~ "
-                            f"{est_budget_high:,.0f}원 수준"
-                        )
-
-                        full_msg = summary_msg + estimate_msg
-                    else:
-                        full_msg = "조건에 맞는 키워드가 없습니다."
-
-                    # 🔹 추천 키워드 조합 (웹용) - 기준 키워드별로 생성
-                    if not df_filtered.empty:
-                        for base in base_keywords:
-                            sub = df_filtered[df_filtered["기준 키워드 출처"] == base]
-                            if sub.empty:
-                                continue
-
-                            sub_sorted = sub.sort_values(
-                                "총 검색수", ascending=False
-                            ).head(10)
-
-                            phrases = []
-                            for _, row in sub_sorted.head(3).iterrows():
-                                kw = row["키워드"]
-                                if base and base not in kw:
-                                    phrase = f"{base} {kw}"
-                                else:
-                                    phrase = kw
-                                phrases.append(phrase)
-
-                            if phrases:
-                                recommended_groups.append(
-                                    {
-                                        "base": base,
-                                        "phrases": phrases,
-                                    }
-                                )
-
-                    # 🔹 블로그 제목 자동 제안 (업종 템플릿 + 지역 포함)
-                    region_placeholder = region if region else ""
-                    for group in recommended_groups:
-                        base = group["base"]
-                        phrases = group["phrases"]
-                        if not phrases:
-                            continue
-                        main_kw = phrases[0]  # 가장 조회수 높은 키워드 사용
-
-                        titles = []
-                        # 랜덤으로 5개만 뽑아서 제안 (매번 다르게)
-                        import random
-                        selected_patterns = random.sample(title_patterns, min(5, len(title_patterns)))
-
-                        for pat in selected_patterns:
-                            # 1. 키워드+조사 처리
-                            # 예: {키워드_을를} -> 사과를 / 수박을
-                            processed_kw_ul = josa(main_kw, '을를')
-                            processed_kw_un = josa(main_kw, '은는')
-                            processed_kw_iga = josa(main_kw, '이가')
-
-                            # 2. 치환 (지역, 키워드, 조사포함키워드)
-                            t = pat.replace("{지역}", region_placeholder)
-                            t = t.replace("{키워드}", main_kw)
-                            t = t.replace("{키워드_을를}", processed_kw_ul)
-                            t = t.replace("{키워드_은는}", processed_kw_un)
-                            t = t.replace("{키워드_이가}", processed_kw_iga)
-
-                            # 3. 공백 정리
-                            t = " ".join(t.split())
-                            titles.append(t)
-
-                        blog_title_groups.append({
-                            "base": base,
-                            "titles": titles,
-                        })
-
-                    # 엑셀 저장 (전체, 필터, 회사정보)
-                    info_rows = [
-                        {"항목": k, "내용": v} for k, v in COMPANY_INFO.items()
-                    ]
-                    df_info = pd.DataFrame(info_rows)
-
-                    ts = datetime.now().strftime("%Y-%m-%d_%H%M")
-                    fname = f"JNT_Keyword_Report_{session['user']}_{ts}.xlsx"
-
-                    out = BytesIO()
-                    with pd.ExcelWriter(out, engine="openpyxl") as w:
-                        df_all.to_excel(w, sheet_name="전체 키워드", index=False)
-                        df_filtered.to_excel(w, sheet_name="필터 적용", index=False)
-                        df_info.to_excel(
-                            w,
-                            sheet_name="전체 키워드",
-                            startrow=len(df_all) + 2,
-                            index=False,
-                        )
-                        df_info.to_excel(
-                            w,
-                            sheet_name="필터 적용",
-                            startrow=len(df_filtered) + 2,
-                            index=False,
-                        )
-                    out.seek(0)
-
-                    LAST_EXCEL[session["user"]] = {
-                        "bytes": out.read(),
-                        "filename": fname,
-                    }
-
-                    downloadable = True
-                    msg = full_msg
+                # 리포트 생성은 작업 큐로 넘기고 진행 상황 페이지로 이동
+                job = submit_job(
+                    session["user"],
+                    {
+                        "keywords": keywords,
+                        "base_keywords": base_keywords,
+                        "min_total": min_total,
+                        "max_comp": max_comp_str,
+                        "max_comp_val": max_comp_val,
+                        "sort_by": sort_by,
+                        "use_cache": not no_cache,
+                        "dedupe": dedupe,
+                        "chart_top": chart_top,
+                        "preset": selected,
+                    },
+                )
+                return redirect(url_for("job_page", job_id=job.id))
 
         elif action == "check_duplication":
             blog_content = request.form.get("blog_content", "").strip()
+            dup_sample_size = form_int(
+                "sample_size", DUP_CHECK_SAMPLE_SIZE, 1, DUP_CHECK_MAX_SAMPLE
+            )
+            dup_full_scan = request.form.get("full_scan") == "1"
             if not blog_content:
                 msg = "검사할 원고 내용을 입력해주세요."
             else:
-                # Step 2에서 만든 함수 호출
-                results, error_msg = check_blog_duplication(blog_content)
+                sentences, eligible, error_msg = select_dup_sentences(
+                    blog_content, sample_size=dup_sample_size, full_scan=dup_full_scan
+                )
                 if error_msg:
                     msg = error_msg
                 else:
-                    dup_results = results
-                    msg = "중복 검사가 완료되었습니다. 아래 결과를 확인하세요."
+                    # 전체 검사는 수백 문장 × 검색 속도 제한이라 요청 스레드에서 돌리지 않는다
+                    job = submit_job(
+                        session["user"],
+                        {
+                            "sentences": sentences,
+                            "eligible": eligible,
+                            "blog_content": blog_content,
+                            "sample_size": dup_sample_size,
+                            "full_scan": dup_full_scan,
+                        },
+                        kind="dup",
+                    )
+                    return redirect(url_for("job_page", job_id=job.id))
 
         else:
             msg = "알 수 없는 동작입니다."
 
     # GET 또는 POST 이후 렌더링
-    return render_template_string(
-        MAIN_HTML,
+    return render_main(
         presets=presets,
         selected=selected,
         keywords=keywords,
         min_total=min_total,
         max_comp=max_comp_str,
         msg=msg,
-        downloadable=downloadable,
         sort_by=sort_by,
-        chart_available=chart_available,
-        chart_labels=chart_labels,
-        chart_pc=chart_pc,
-        chart_mo=chart_mo,
-        chart_comp=chart_comp,
-        chart_count=chart_count,
-        summary_table=summary_table,
-        recommended_groups=recommended_groups,
-        blog_title_groups=blog_title_groups,
-        report_title=report_title,
-        industry_name=industry_name,
+        no_cache=no_cache,
+        dedupe=dedupe,
+        chart_top=chart_top,
         blog_content=blog_content,
-        dup_results=dup_results,
+        dup_sample_size=dup_sample_size,
+        dup_full_scan=dup_full_scan,
+    )
+
+
+# ==========================
+# 리포트 작업 상태 / 결과
+# ==========================
+@app.route("/jobs/<job_id>")
+def job_page(job_id):
+    """진행 중이면 진행률 화면, 끝났으면 리포트 결과 화면"""
+    if "user" not in session:
+        return redirect("/login")
+    job = get_user_job(job_id)
+    if job is None:
+        return redirect(url_for("index"))
+
+    p = job.params
+    if job.kind == "dup":
+        form_values = {
+            "presets": load_presets(),
+            "blog_content": p["blog_content"],
+            "dup_sample_size": p["sample_size"],
+            "dup_full_scan": p["full_scan"],
+        }
+        if job.status == "done":
+            summary = job.result["dup_summary"]
+            msg = "중복 검사가 완료되었습니다. 아래 결과를 확인하세요."
+            if summary["eligible"] > summary["total"]:
+                msg += f" (검사 대상 {summary['eligible']}문장 중 {summary['total']}문장 검사)"
+            return render_main(
+                msg=msg,
+                **form_values,
+                **job.result,
+            )
+        if job.status == "error":
+            return render_main(msg=f"중복 검사 중 오류가 발생했습니다: {html.escape(job.error)}", **form_values)
+        return render_main(job=job.to_status(), **form_values)
+
+    form_values = {
+        "presets": load_presets(),
+        "selected": p["preset"],
+        "keywords": p["keywords"],
+        "min_total": p["min_total"],
+        "max_comp": p["max_comp"],
+        "sort_by": p["sort_by"],
+        "no_cache": not p["use_cache"],
+        "dedupe": p["dedupe"],
+        "chart_top": p["chart_top"],
+    }
+    if job.status == "done":
+        # 다운로드는 REPORT_STORE에서 (다른 워커/재시작/작업 만료 후에도 받을 수 있음)
+        report_id = job.result["report_id"]
+        return render_main(
+            download_url=url_for("download", report=report_id) if report_id else None,
+            **form_values,
+            **job.result,
+        )
+    if job.status == "error":
+        return render_main(msg=f"리포트 생성 중 오류가 발생했습니다: {html.escape(job.error)}", **form_values)
+    return render_main(job=job.to_status(), **form_values)
+
+
+@app.route("/jobs/<job_id>/status")
+def job_status(job_id):
+    if "user" not in session:
+        return jsonify({"error": "login required"}), 401
+    job = get_user_job(job_id)
+    if job is None:
+        return jsonify({"error": "not found"}), 404
+    return jsonify(job.to_status())
+
+
+@app.route("/jobs/<job_id>/events")
+def job_events(job_id):
+    """
+    Server-Sent Events: 기준 키워드별 수집 결과(수집 수, 상위 키워드, 오류)를
+    나오는 즉시 보내고, 작업이 끝나면 done/error 이벤트로 마무리한다.
+    재접속 시 Last-Event-ID 다음 이벤트부터 이어서 보낸다.
+    """
+    if "user" not in session:
+        return "login required", 401
+    job = get_user_job(job_id)
+    if job is None:
+        return "not found", 404
+
+    try:
+        start = int(request.headers.get("Last-Event-ID", -1)) + 1
+    except ValueError:
+        start = 0
+
+    def stream():
+        pos = start
+        while True:
+            events, finished = job.wait_events(pos, timeout=15)
+            for event in events:
+                payload = json.dumps(event, ensure_ascii=False)
+                yield f"id: {pos}\nevent: {event['type']}\ndata: {payload}\n\n"
+                pos += 1
+            if finished and not events:
+                return
+            if not events:
+                yield ": keep-alive\n\n"
+
+    return Response(
+        stream(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
 
@@ -1357,6 +3671,7 @@ button{padding:6px 10px;border:none;border-radius:6px;font-size:13px;cursor:poin
 </div>
 </body></html>
 """
+ADMIN_TEMPLATE = app.jinja_env.from_string(ADMIN_HTML)  # 시작 시 한 번만 컴파일
 
 
 @app.route("/admin/accounts", methods=["GET", "POST"])
@@ -1370,9 +3685,8 @@ def manage_accounts():
         action = request.form.get("action")
         if action == "delete":
             del_uid = request.form.get("del_uid", "").strip()
-            if del_uid and del_uid in ACCOUNTS and del_uid != "admin":
-                ACCOUNTS.pop(del_uid)
-                save_accounts()
+            if del_uid and del_uid != "admin" and STORE.delete_account(del_uid):
+                REPORT_STORE.delete_user(del_uid)
                 msg = f"계정 '{del_uid}'이(가) 삭제되었습니다."
             else:
                 msg = "삭제할 수 없는 계정입니다."
@@ -1384,31 +3698,26 @@ def manage_accounts():
             new_industry = request.form.get("new_industry", "").strip() or "driving"
             if not new_uid or not new_pw or not new_name:
                 msg = "아이디, 비밀번호, 이름을 모두 입력해 주세요."
-            elif new_uid in ACCOUNTS:
+            elif not STORE.add_account(
+                new_uid, new_pw, new_name, new_region, new_industry
+            ):
                 msg = "이미 존재하는 아이디입니다."
             else:
-                ACCOUNTS[new_uid] = {
-                    "password": new_pw,
-                    "name": new_name,
-                    "region": new_region,
-                    "industry": new_industry,
-                }
-                save_accounts()
                 msg = f"계정 '{new_uid}'이(가) 추가되었습니다."
         else:
             msg = "알 수 없는 동작입니다."
 
     # view용 객체로 변환 (info.name, info.region, info.industry 등 접근 가능하게)
     accounts_for_view = {}
-    for uid, info in ACCOUNTS.items():
+    for uid, info in STORE.list_accounts().items():
         obj = type("obj", (), {})()
         obj.name = info.get("name", "")
         obj.region = info.get("region", "")
         obj.industry = info.get("industry", "")
         accounts_for_view[uid] = obj
 
-    return render_template_string(
-        ADMIN_HTML,
+    return render_template(
+        ADMIN_TEMPLATE,
         accounts=accounts_for_view,
         msg=msg,
     )
@@ -1422,22 +3731,341 @@ def download():
     if "user" not in session:
         return redirect("/login")
 
-    uid = session["user"]
-    if uid not in LAST_EXCEL:
+    # ?report=<id> 로 보관 중인 이전 리포트도 받을 수 있음 (없으면 최신 리포트)
+    # ?format=xlsx(기본)|csv|parquet|jsonl, ?sheet=all(기본)|filtered
+    fmt = request.args.get("format", "xlsx")
+    sheet = request.args.get("sheet", "all")
+    if fmt != "xlsx" and fmt not in EXPORT_FORMATS:
+        return "지원하지 않는 형식입니다.", 400
+    if sheet not in ("all", "filtered"):
+        return "sheet는 all 또는 filtered 여야 합니다.", 400
+
+    export = REPORT_STORE.get(session["user"], request.args.get("report") or None)
+    if export is None:
         return "리포트를 먼저 생성하세요.", 400
 
-    blob = LAST_EXCEL[uid]
-    return send_file(
-        BytesIO(blob["bytes"]),
-        mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        as_attachment=True,
-        download_name=blob["filename"],
+    if fmt == "xlsx":
+        return send_report_excel(export)
+    user_info = STORE.get_account(session["user"]) or {}
+    tpl = load_industry_template(user_info.get("industry", "driving"))
+    return send_report_export(export, fmt, sheet, tpl.get("excel_columns"))
+
+
+# ==========================
+# 프리셋 미리 계산 (prewarm)
+# ==========================
+def prefetch_keywords(keyword_lists, refresh=False, rps=None, workers=REPORT_JOB_WORKERS):
+    """
+    기준 키워드 목록(프리셋)별로 collect_keyword_rows()를 불러 캐시/이력을 채우고 실패한 기준 키워드 목록을 반환한다.
+    묶음 호출 결과는 묶음 단위로 캐시되므로, 화면에서 같은 프리셋을 실행할 때와 같은 묶음이 되도록
+    전체 키워드를 한데 모으지 않고 목록별로 수집한다 (같은 목록은 한 번만).
+    rps를 주면 이번 호출 동안만 KEYWORD_API_BUCKET의 초당 호출 수를 그 값으로 바꾼다.
+    """
+    unique = list(dict.fromkeys(tuple(kws) for kws in keyword_lists if kws))
+    old_rate = KEYWORD_API_BUCKET.rate
+    if rps is not None:
+        KEYWORD_API_BUCKET.rate = float(rps)
+    failed = []
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as ex:
+            for _, part in ex.map(
+                lambda kws: collect_keyword_rows(list(kws), use_cache=not refresh), unique
+            ):
+                failed.extend(part)
+    finally:
+        KEYWORD_API_BUCKET.rate = old_rate
+    return list(dict.fromkeys(failed))
+
+
+def prewarm_presets(refresh=False, rps=None, log=print):
+    """
+    모든 계정의 프리셋과 공용 프리셋을 미리 수집해 캐시/이력을 채운다 (아침 첫 요청이 캐시 조회로 끝나도록).
+    리포트는 사용자가 고른 조건(필터/정렬/중복 합치기)으로 만들어야 하므로 여기서 만들지 않고,
+    계정 프리셋은 build_report()와 같은 키/날짜로 데이터 조회일 스냅샷(증감 비교용)만 남긴다.
+    keywordstool 호출은 KEYWORD_API_BUCKET을 그대로 쓰므로 서버 안에서 돌리면 사용자 요청과 한도를 나눠 쓴다.
+    rps를 주면 이번 실행 동안만 버킷의 초당 호출 수를 그 값으로 바꾼다 (별도 프로세스로 돌릴 때).
+    refresh=True 면 캐시/이력을 무시하고 모두 새로 조회한다.
+    """
+    started = time.time()
+    targets = [
+        (uid, name, split_keywords(keywords))
+        for uid in STORE.list_accounts()
+        for name, keywords in STORE.presets(uid).items()
+    ]
+    shared = [split_keywords(keywords) for keywords in STORE.shared_presets().values()]
+    bases = list(dict.fromkeys(
+        [b for _, _, kws in targets for b in kws] + [b for kws in shared for b in kws]
+    ))
+    log(f"프리셋 {len(targets)}개 + 공용 프리셋 {len(shared)}개, 기준 키워드 {len(bases)}개")
+
+    failed = prefetch_keywords(
+        [kws for _, _, kws in targets] + shared, refresh=refresh, rps=rps
     )
+    if failed:
+        log("조회 실패: " + ", ".join(failed))
+
+    # 방금 채운 캐시에서 다시 모아 스냅샷만 저장 (일부 기준 키워드가 빠지면 build_report()처럼 건너뜀)
+    errors = []
+    saved = 0
+    for uid, name, kws in targets:
+        try:
+            rows, missing = collect_keyword_rows(kws)
+            if missing or not len(rows):
+                continue
+            fetched_at = max(rows.fetched_at.values(), default=time.time())
+            REPORT_SNAPSHOTS.save(uid, snapshot_key(name, kws), rows.to_frame(), fetched_at)
+            saved += 1
+        except Exception as e:
+            errors.append(f"{uid}/{name}: {e}")
+            log(f"스냅샷 실패 {uid}/{name}: {e}")
+    log(f"완료: 스냅샷 {saved}/{len(targets)}개, {time.time() - started:.1f}초")
+    return {
+        "bases": len(bases),
+        "failed": failed,
+        "snapshots": saved,
+        "errors": errors,
+    }
+
+
+def seconds_until(hhmm):
+    """다음 HH:MM 까지 남은 초"""
+    hour, minute = (int(x) for x in hhmm.split(":"))
+    now = datetime.now()
+    target = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    wait = (target - now).total_seconds()
+    return wait if wait > 0 else wait + 24 * 3600
+
+
+def start_prewarm_scheduler(at):
+    """
+    매일 at(HH:MM)에 prewarm_presets()를 실행하는 데몬 스레드.
+    serve()에서만 시작한다 (WSGI 서버로 띄울 때는 cron으로 `prewarm` 명령 실행).
+    """
+    seconds_until(at)  # 형식이 틀리면 서버 시작 시 바로 오류
+
+    def loop():
+        while True:
+            time.sleep(seconds_until(at))
+            try:
+                prewarm_presets()
+            except Exception as e:
+                print(f"프리셋 미리 계산 실패: {e}")
+
+    threading.Thread(target=loop, name="prewarm", daemon=True).start()
+
+
+# ==========================
+# 배치 리포트 (CLI)
+# ==========================
+UNSAFE_FILENAME_RE = re.compile(r'[\\/:*?"<>|\s]+')
+
+
+def write_report_files(report, out_dir, stem, fmt, excel_columns):
+    """
+    build_report() 결과를 out_dir에 파일로 쓴다. 쓴 파일 경로 목록을 반환.
+    xlsx는 시트 2개짜리 엑셀 1개, csv/jsonl/parquet는 전체/필터 시트별 파일,
+    요약표/추천 조합/블로그 제목/증감 상위 키워드는 <stem>_summary.json 으로 남긴다.
+    """
+    export = report["excel"]
+    paths = []
+    if fmt == "xlsx":
+        path = os.path.join(out_dir, f"{stem}.xlsx")
+        if export.streaming:
+            tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+            with open(tmp, "wb") as f:
+                write_report_excel_streaming(f, export.df_all, export.df_filtered)
+            os.replace(tmp, path)
+        else:
+            write_file_atomic(path, export.excel_bytes())
+        paths.append(path)
+    else:
+        for sheet in ("all", "filtered"):
+            df, _ = export_frame(export, fmt, sheet, excel_columns)
+            path = os.path.join(out_dir, f"{stem}_{sheet}.{EXPORT_FORMATS[fmt][1]}")
+            tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+            if fmt == "parquet":
+                df.to_parquet(tmp, index=False, compression="zstd")
+            else:
+                chunks = stream_csv(df) if fmt == "csv" else stream_jsonl(df)
+                with open(tmp, "w", encoding="utf-8", newline="") as f:
+                    f.writelines(chunks)
+            os.replace(tmp, path)
+            paths.append(path)
+
+    summary = {
+        key: report[key]
+        for key in (
+            "summary_table", "recommended_groups", "blog_title_groups",
+            "trend_date", "trend_counts", "trend_up", "trend_down",
+        )
+    }
+    path = os.path.join(out_dir, f"{stem}_summary.json")
+    write_file_atomic(path, json.dumps(summary, ensure_ascii=False, indent=2).encode("utf-8"))
+    paths.append(path)
+    return paths
+
+
+def batch_reports(targets, out_dir, fmt="xlsx", refresh=False, rps=None,
+                  workers=REPORT_JOB_WORKERS, log=print, **options):
+    """
+    targets: [(계정 ID, 프리셋 이름, 기준 키워드 목록)]
+    모든 기준 키워드를 중복 없이 먼저 병렬 수집(초당 호출 수 제한)한 뒤,
+    리포트 생성과 파일 쓰기는 workers개 스레드에서 동시에 진행한다.
+    options는 build_report()의 필터/정렬 인자(min_total, max_comp_val, sort_by, dedupe).
+    반환: 실패한 [(계정 ID, 프리셋 이름, 오류)]
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    bases = list(dict.fromkeys(b for _, _, kws in targets for b in kws))
+    started = time.time()
+    failed_bases = prefetch_keywords(
+        [kws for _, _, kws in targets], refresh=refresh, rps=rps, workers=workers
+    )
+    log(f"기준 키워드 {len(bases)}개 수집 ({time.time() - started:.1f}초)")
+    if failed_bases:
+        log("조회 실패: " + ", ".join(failed_bases))
+
+    date = datetime.now().strftime("%Y-%m-%d")
+
+    def run(uid, name, kws):
+        report = build_report(uid, kws, preset=name, store=False, **options)
+        if report["excel"] is None:
+            raise ValueError(re.sub(r"<[^>]+>", " ", report["msg"] or "").strip())
+        user_info = STORE.get_account(uid) or {}
+        tpl = load_industry_template(user_info.get("industry", "driving"))
+        stem = UNSAFE_FILENAME_RE.sub("_", f"JNT_Keyword_Report_{uid}_{name or 'keywords'}_{date}")
+        return write_report_files(report, out_dir, stem, fmt, tpl.get("excel_columns"))
+
+    errors = []
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as ex:
+        futures = {ex.submit(run, *target): target for target in targets}
+        for fut in as_completed(futures):
+            uid, name, _ = futures[fut]
+            try:
+                paths = fut.result()
+            except Exception as e:
+                errors.append((uid, name, str(e)))
+                log(f"실패 {uid}/{name}: {e}")
+                continue
+            log(f"{uid}/{name}: " + ", ".join(os.path.basename(p) for p in paths))
+    log(
+        f"완료: 리포트 {len(targets) - len(errors)}/{len(targets)}개, "
+        f"{time.time() - started:.1f}초"
+    )
+    return errors
+
+
+def report_targets(account_ids, preset_names, keywords):
+    """
+    CLI 인자 → ([(계정 ID, 프리셋 이름, 기준 키워드 목록)], 오류 메시지 목록)
+    계정을 생략하면 모든 계정, 프리셋을 생략하면 계정의 모든 프리셋.
+    프리셋 이름은 계정 프리셋에서 먼저 찾고 없으면 공용 프리셋에서 찾는다.
+    keywords를 주면 프리셋 대신 그 키워드로 계정마다 리포트 1개.
+    """
+    accounts = STORE.list_accounts()
+    account_ids = account_ids or list(accounts)
+    shared = STORE.shared_presets()
+    targets, errors = [], []
+    for uid in account_ids:
+        if uid not in accounts:
+            errors.append(f"없는 계정: {uid}")
+            continue
+        if keywords:
+            targets.append((uid, "", split_keywords(keywords)))
+            continue
+        presets = STORE.presets(uid)
+        for name in preset_names or list(presets):
+            text = presets.get(name, shared.get(name))
+            if text is None:
+                errors.append(f"없는 프리셋: {uid}/{name}")
+            else:
+                targets.append((uid, name, split_keywords(text)))
+    return targets, errors
 
 
 # ==========================
 # 앱 실행
 # ==========================
-if __name__ == "__main__":
+def serve():
     port = int(os.environ.get("PORT", 5050))
-    app.run(host="0.0.0.0", port=port, debug=True)
\ No newline at end of file
+    debug = True
+    # 디버그 리로더는 감시용 부모 프로세스가 따로 있으므로 실제 서버 프로세스에서만 스케줄러 시작
+    if PREWARM_AT and (not debug or os.environ.get("WERKZEUG_RUN_MAIN") == "true"):
+        start_prewarm_scheduler(PREWARM_AT)
+    app.run(host="0.0.0.0", port=port, debug=debug)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="J&T Solution 키워드 리포트")
+    sub = parser.add_subparsers(dest="command")
+    sub.add_parser("serve", help="웹 서버 실행 (명령을 생략하면 이것)")
+    p_prewarm = sub.add_parser(
+        "prewarm", help="모든 계정/공용 프리셋을 미리 조회하고 증감 비교용 스냅샷을 남긴다 (cron용)"
+    )
+    p_prewarm.add_argument(
+        "--refresh", action="store_true", help="캐시/저장된 이력을 무시하고 모두 새로 조회"
+    )
+    p_prewarm.add_argument(
+        "--rps", type=float, default=PREWARM_RPS,
+        help="keywordstool 초당 호출 수 (서버와 나눠 쓰도록 낮게, 기본 PREWARM_RPS)",
+    )
+    p_report = sub.add_parser(
+        "report", help="계정/프리셋별 리포트를 파일로 만든다 (여러 계정을 한 번에)"
+    )
+    p_report.add_argument(
+        "--account", action="append", default=[], help="계정 ID (여러 번 지정 가능, 생략하면 모든 계정)"
+    )
+    p_report.add_argument(
+        "--preset", action="append", default=[],
+        help="프리셋 이름 (여러 번 지정 가능, 생략하면 계정의 모든 프리셋, 공용 프리셋도 가능)",
+    )
+    p_report.add_argument("--keywords", help="프리셋 대신 쉼표로 구분한 기준 키워드")
+    p_report.add_argument("--out", required=True, help="출력 폴더")
+    p_report.add_argument(
+        "--format", choices=["xlsx", *EXPORT_FORMATS], default="xlsx", help="출력 형식 (기본 xlsx)"
+    )
+    p_report.add_argument("--min-total", type=int, default=0, help="최소 총 검색수")
+    p_report.add_argument("--max-comp", type=float, help="최대 경쟁도 (0~1)")
+    p_report.add_argument("--sort-by", choices=["total", "comp"], default="total")
+    p_report.add_argument("--dedupe", action="store_true", help="기준 키워드 간 중복 키워드 합치기")
+    p_report.add_argument(
+        "--refresh", action="store_true", help="캐시/저장된 이력을 무시하고 모두 새로 조회"
+    )
+    p_report.add_argument(
+        "--rps", type=float, default=PREWARM_RPS,
+        help="keywordstool 초당 호출 수 (기본 PREWARM_RPS)",
+    )
+    p_report.add_argument(
+        "--workers", type=int, default=REPORT_JOB_WORKERS,
+        help="동시에 만들고 쓸 리포트 수 (기본 REPORT_JOB_WORKERS)",
+    )
+    args = parser.parse_args(argv)
+
+    if args.command == "prewarm":
+        result = prewarm_presets(refresh=args.refresh, rps=args.rps)
+        return 1 if result["failed"] or result["errors"] else 0
+    if args.command == "report":
+        targets, errors = report_targets(args.account, args.preset, args.keywords)
+        for e in errors:
+            print(e)
+        if not targets:
+            print("만들 리포트가 없습니다.")
+            return 1
+        failed = batch_reports(
+            targets,
+            args.out,
+            fmt=args.format,
+            refresh=args.refresh,
+            rps=args.rps,
+            workers=args.workers,
+            min_total=args.min_total,
+            max_comp_val=args.max_comp,
+            sort_by=args.sort_by,
+            dedupe=args.dedupe,
+        )
+        return 1 if errors or failed else 0
+    serve()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
\ No newline at end of file
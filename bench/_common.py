@@ -0,0 +1,36 @@
+"""
+벤치마크 공통 도우미.
+app.py는 import 할 때 현재 폴더에 SQLite 파일을 만들기 때문에 임시 폴더에서 불러오고,
+결과는 화면에 출력하면서 저장소 루트의 bench_output.txt 에도 이어 붙인다.
+"""
+import os
+import sys
+import tempfile
+import timeit
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+OUTPUT = os.path.join(ROOT, "bench_output.txt")
+
+
+def load_app():
+    os.chdir(tempfile.mkdtemp(prefix="jnt-bench-"))
+    sys.path.insert(0, ROOT)
+    import app
+
+    return app
+
+
+def per_call_ms(fn, number):
+    """fn 1회 평균 실행 시간(ms). 한 번 먼저 실행해 준비 비용은 빼고 잰다."""
+    fn()
+    return timeit.timeit(fn, number=number) / number * 1000
+
+
+def report(title, lines):
+    text = "\n".join(
+        [f"== {title} ({datetime.now().strftime('%Y-%m-%d %H:%M')}) ==", *lines, ""]
+    )
+    print(text)
+    with open(OUTPUT, "a", encoding="utf-8") as f:
+        f.write(text + "\n")
@@ -0,0 +1,51 @@
+"""
+원고 중복 검사: 검색 결과 페이지 판정 CPU 시간 비교 (user-010)
+  이전: BeautifulSoup(html.parser) 트리를 만든 뒤 soup.text 에서 "검색결과가 없습니다" 찾기
+  현재: app.detect_search_results() 로 원문 문자열 검사 + 상위 결과 링크 추출
+
+실행: python bench/bench_dup_detect.py  (이전 경로 측정에는 pip install -r bench/requirements.txt)
+"""
+from _common import load_app, per_call_ms, report
+
+app = load_app()
+
+
+def search_page(hits):
+    """네이버 검색 결과와 비슷한 크기/구조의 합성 페이지 (스크립트/스타일 + 결과 항목 hits개)"""
+    head = "<html><head>" + "<style>.x{color:red}</style>" * 400
+    head += "<script>var a = 1;" + "x" * 20000 + "</script></head><body>"
+    filler = "".join(
+        f'<div class="api_subject_bx"><span class="sub_txt">안내 문구 {i}</span></div>'
+        for i in range(1500)
+    )
+    if hits:
+        items = "".join(
+            f'<li class="bx"><div class="total_wrap"><a href="https://blog.naver.com/user{i}/{i}" '
+            f'class="title_link _cross_trigger">중복 <mark>문장</mark> 결과 {i}</a>'
+            f'<div class="dsc_txt">{"본문 미리보기 " * 30}</div></div></li>'
+            for i in range(hits)
+        )
+    else:
+        items = '<div class="not_found02"><p class="dsc">검색결과가 없습니다</p></div>'
+    return head + filler + items + "</body></html>"
+
+
+def old_detect(page):
+    from bs4 import BeautifulSoup
+
+    return "검색결과가 없습니다" not in BeautifulSoup(page, "html.parser").text
+
+
+pages = {"결과 있음": search_page(hits=300), "결과 없음": search_page(hits=0)}
+lines = []
+for name, page in pages.items():
+    new_ms = per_call_ms(lambda: app.detect_search_results(page), 50)
+    try:
+        old_ms = f"{per_call_ms(lambda: old_detect(page), 3):8.1f} ms"
+        same = old_detect(page) == app.detect_search_results(page)[0]
+    except ImportError:
+        old_ms, same = "(beautifulsoup4 없음)", "-"
+    lines.append(
+        f"{name:<6} {len(page) // 1024:>5} KB  bs4 {old_ms}  detector {new_ms:8.3f} ms  같은 판정: {same}"
+    )
+report("검색 결과 페이지 판정 (bs4 vs detect_search_results)", lines)
@@ -0,0 +1,69 @@
+"""
+엑셀 내보내기 시간 / 최대 메모리(RSS) 비교 (user-016)
+  pandas:    app.build_report_excel()  (pd.ExcelWriter, 워크북 전체를 메모리에 만든 뒤 bytes)
+  streaming: app.stream_report_excel() (openpyxl write-only, 조각을 흘려보냄)
+같은 고정 데이터(난수 시드 고정)로 모드마다 별도 프로세스에서 재서 최대 RSS가 섞이지 않게 한다.
+
+실행: python bench/bench_excel.py [행 수 ...]   (기본 1000 10000 100000, 100k pandas는 1분 가까이 걸림)
+"""
+import os
+import resource
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+
+def child(n, mode):
+    from _common import load_app
+
+    app = load_app()
+    rng = np.random.default_rng(0)
+    rows = app.KeywordColumns()
+    rows.extend("기준", [
+        {
+            "relKeyword": f"키워드{i}",
+            "monthlyPcQcCnt": int(rng.integers(0, 9999)),
+            "monthlyMobileQcCnt": int(rng.integers(0, 9999)),
+            "compIdx": "중간",
+            "plAvgDepth": 3.5,
+        }
+        for i in range(n)
+    ])
+    df_all = rows.to_frame()
+    df_filtered = df_all[df_all["총 검색수"] > 5000].sort_values("총 검색수", ascending=False)
+
+    base = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    started = time.perf_counter()
+    if mode == "pandas":
+        size = len(app.build_report_excel(df_all, df_filtered))
+    else:
+        size = sum(len(chunk) for chunk in app.stream_report_excel(df_all, df_filtered))
+    elapsed = time.perf_counter() - started
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss  # Linux: KB
+    print(f"{elapsed:.2f} {(peak - base) / 1024:.1f} {size // 1024}")
+
+
+def main():
+    from _common import report
+
+    sizes = [int(x) for x in sys.argv[1:]] or [1000, 10000, 100000]
+    here = os.path.dirname(os.path.abspath(__file__))
+    lines = [f"{'rows':>8}  {'mode':<9} {'time':>8}  {'peak RSS':>12}  size"]
+    for n in sizes:
+        for mode in ("pandas", "streaming"):
+            out = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--child", str(n), mode],
+                cwd=here, capture_output=True, text=True, check=True,
+            ).stdout.split()
+            elapsed, rss, size = float(out[0]), float(out[1]), int(out[2])
+            lines.append(f"{n:>8,}  {mode:<9} {elapsed:6.2f} s  +{rss:8.1f} MB  {size:,} KB")
+    report("엑셀 내보내기 (pd.ExcelWriter vs write-only 스트리밍)", lines)
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--child"]:
+        child(int(sys.argv[2]), sys.argv[3])
+    else:
+        main()
@@ -0,0 +1,82 @@
+"""
+기준 키워드별 요약표 + 추천 조합 계산 시간 비교 (user-011)
+  이전: 기준 키워드마다 df[df["기준 키워드 출처"] == base] 로 걸러 요약/정렬 + iterrows()
+  현재: app.summarize_by_base() (groupby 한 번 + 그룹별 상위 3개)
+고정 데이터: 기준 키워드 50개 x 연관 키워드 1,000개 (난수 시드 고정)
+
+실행: python bench/bench_summary.py
+"""
+import numpy as np
+
+from _common import load_app, per_call_ms, report
+
+app = load_app()
+
+BASES, PER_BASE = 50, 1000
+MIN_TOTAL, MAX_COMP = 100, 0.8
+
+
+def fixture():
+    rng = np.random.default_rng(0)
+    rows = app.KeywordColumns()
+    for b in range(BASES):
+        base = f"기준{b}"
+        rows.extend(base, [
+            {
+                "relKeyword": f"{base} 연관{i}" if i % 3 else f"연관{b}_{i}",
+                "monthlyPcQcCnt": int(rng.integers(0, 10000)),
+                "monthlyMobileQcCnt": int(rng.integers(0, 10000)),
+                "compIdx": str(rng.choice(["낮음", "중간", "높음"])),
+                "plAvgDepth": 3,
+            }
+            for i in range(PER_BASE)
+        ])
+    df_all = rows.to_frame()
+    comp = df_all["경쟁도"].astype("float64")
+    pass_mask = (df_all["총 검색수"] >= MIN_TOTAL) & comp.notna() & (comp <= MAX_COMP)
+    df_filtered = df_all[pass_mask].sort_values("총 검색수", ascending=False)
+    return [f"기준{b}" for b in range(BASES)], df_all, df_filtered, pass_mask
+
+
+def old_summary(base_keywords, df_all, df_filtered):
+    """user-011 이전 build 코드의 요약표/추천 조합 부분"""
+    summary_table, recommended_groups = [], []
+    for base in base_keywords:
+        sub = df_all[df_all["기준 키워드 출처"] == base]
+        if sub.empty:
+            continue
+        sub_pass = sub[
+            (sub["총 검색수"] >= MIN_TOTAL) & (sub["경쟁도"].notna()) & (sub["경쟁도"] <= MAX_COMP)
+        ]
+        summary_table.append({
+            "기준 키워드": base,
+            "수집 키워드 수": len(sub),
+            "평균 검색량": int(sub["총 검색수"].mean()),
+            "평균 경쟁도": round(sub["경쟁도"].mean(), 2),
+            "조건 통과": len(sub_pass),
+        })
+    for base in base_keywords:
+        sub = df_filtered[df_filtered["기준 키워드 출처"] == base]
+        if sub.empty:
+            continue
+        phrases = []
+        for _, row in sub.sort_values("총 검색수", ascending=False).head(10).head(3).iterrows():
+            kw = row["키워드"]
+            phrases.append(f"{base} {kw}" if base and base not in kw else kw)
+        recommended_groups.append({"base": base, "phrases": phrases})
+    return summary_table, recommended_groups
+
+
+bases, df_all, df_filtered, pass_mask = fixture()
+old_ms = per_call_ms(lambda: old_summary(bases, df_all, df_filtered), 5)
+new_ms = per_call_ms(lambda: app.summarize_by_base(df_all, df_filtered, pass_mask, bases), 20)
+old_tables = old_summary(bases, df_all, df_filtered)
+new_tables = app.summarize_by_base(df_all, df_filtered, pass_mask, bases)
+report(
+    f"기준 키워드별 요약 ({BASES} bases x {PER_BASE:,} rows)",
+    [
+        f"기준 키워드별 루프 {old_ms:8.1f} ms",
+        f"summarize_by_base {new_ms:8.1f} ms  ({old_ms / new_ms:.1f}x)",
+        f"요약표 동일: {old_tables[0] == new_tables[0]}, 추천 조합 동일: {old_tables[1] == new_tables[1]}",
+    ],
+)
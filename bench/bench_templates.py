@@ -0,0 +1,49 @@
+"""
+GET / 렌더링 시간 비교 (user-019)
+  이전: render_template_string(MAIN_HTML, ...)  (요청마다 템플릿 파싱/컴파일)
+  현재: render_template(MAIN_TEMPLATE, ...)     (시작 시 한 번 컴파일한 템플릿)
+로그인한 사용자의 GET / 전체 요청(테스트 클라이언트)과 render_main() 렌더링만 따로 잰다.
+
+실행: python bench/bench_templates.py
+"""
+import flask
+
+from _common import load_app, per_call_ms, report
+
+app = load_app()
+app.STORE.add_account("bench", "bench", "벤치마크", "강북", "driving")
+
+N = 300
+client = app.app.test_client()
+with client.session_transaction() as s:
+    s["user"] = "bench"
+    s["name"] = "벤치마크"
+
+
+
+def render_from_source(template, **context):
+    """이전 방식: 요청마다 MAIN_HTML 원문을 render_template_string()으로 렌더링"""
+    return flask.render_template_string(app.MAIN_HTML, **context)
+
+
+results = {}
+# render_main()이 부르는 렌더 함수만 바꿔 같은 경로로 잰다
+for label, render in (
+    ("render_template_string", render_from_source),
+    ("precompiled", flask.render_template),
+):
+    app.render_template = render
+    get_ms = per_call_ms(lambda: client.get("/"), N)
+    with app.app.test_request_context("/"):
+        app.session["user"] = "bench"
+        render_ms = per_call_ms(app.render_main, N)
+    results[label] = (get_ms, render_ms)
+
+old, new = results["render_template_string"], results["precompiled"]
+report(
+    f"GET / 렌더링 ({N}회 평균)",
+    [
+        f"GET /          {old[0]:7.2f} ms -> {new[0]:6.2f} ms",
+        f"render_main()  {old[1]:7.2f} ms -> {new[1]:6.2f} ms",
+    ],
+)
@@ -0,0 +1,63 @@
+"""
+"상위 N개" 선택 시간 비교 (user-014)
+  그래프: df.sort_values().head(N)  vs  df.nlargest(N)
+  추천 조합: 정렬 후 groupby().head(k)  vs  app.top_k_per_group()
+고정 데이터: 기준 키워드 50개, 행 수 10k / 100k / 1M (난수 시드 고정)
+
+실행: python bench/bench_topk.py [행 수 ...]
+"""
+import sys
+
+import numpy as np
+import pandas as pd
+
+from _common import load_app, per_call_ms, report
+
+app = load_app()
+
+GROUPS, CHART_N, K = 50, 20, 3
+SRC, VALUE = "기준 키워드 출처", "총 검색수"
+
+
+def fixture(n):
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "키워드": [f"k{i}" for i in range(n)],
+        VALUE: rng.integers(0, 100000, n).astype("int32"),
+        SRC: pd.Categorical.from_codes(
+            rng.integers(0, GROUPS, n), [f"b{i}" for i in range(GROUPS)]
+        ),
+    })
+
+
+def old_per_group(df):
+    return df.sort_values(VALUE, ascending=False, kind="stable").groupby(
+        SRC, sort=False, observed=True
+    ).head(K)
+
+
+sizes = [int(x) for x in sys.argv[1:]] or [10_000, 100_000, 1_000_000]
+lines = [
+    f"{'rows':>9}  {'chart sort+head':>16} {'nlargest':>10}  "
+    f"{'group sort+head':>16} {'top_k':>10}  same"
+]
+for n in sizes:
+    df = fixture(n)
+    number = 20 if n <= 100_000 else 3
+    chart_old = per_call_ms(lambda: df.sort_values(VALUE, ascending=False).head(CHART_N), number)
+    chart_new = per_call_ms(lambda: df.nlargest(CHART_N, VALUE), number)
+    group_old = per_call_ms(lambda: old_per_group(df), number)
+    group_new = per_call_ms(lambda: app.top_k_per_group(df, SRC, VALUE, K), number)
+    # 같은 값(검색수)을 고르는지 확인 (그룹 안 순서는 그룹/값 기준으로 맞춰 비교)
+    same_chart = (
+        df.sort_values(VALUE, ascending=False).head(CHART_N)[VALUE].tolist()
+        == df.nlargest(CHART_N, VALUE)[VALUE].tolist()
+    )
+    order = {"by": [SRC, VALUE], "ascending": [True, False], "kind": "stable"}
+    a = old_per_group(df).sort_values(**order)
+    b = app.top_k_per_group(df, SRC, VALUE, K).sort_values(**order)
+    same = same_chart and a.index.tolist() == b.index.tolist()
+    lines.append(
+        f"{n:>9,}  {chart_old:13.1f} ms {chart_new:7.1f} ms  {group_old:13.1f} ms {group_new:7.1f} ms  {same}"
+    )
+report(f"상위 N개 선택 (그래프 N={CHART_N}, 그룹 {GROUPS}개 x 상위 {K}개)", lines)